@@ -83,6 +83,19 @@ SECTOR_PAIRS = {
     },
 }
 
+# 板块对扁平列表 (import时展开一次): (类别, 对名, 分子, 分母, 名称)
+SECTOR_PAIR_LIST = [
+    (category, pair_key, ticker1, ticker2, name)
+    for category, pairs in SECTOR_PAIRS.items()
+    for pair_key, (ticker1, ticker2, name) in pairs.items()
+]
+
+# 板块对涉及的所有ticker (去重)
+SECTOR_PAIR_TICKERS = tuple(sorted({
+    ticker for _, _, ticker1, ticker2, _ in SECTOR_PAIR_LIST
+    for ticker in (ticker1, ticker2)
+}))
+
 # AKShare 指数 (A股/港股)
 AKSHARE_INDICES = {
     'sh000300': '沪深300',
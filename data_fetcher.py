@@ -11,7 +11,7 @@ warnings.filterwarnings('ignore')
 
 from config import (
     FRED_INDICATORS, YAHOO_INDICATORS, ROTATION_ETFS, 
-    SECTOR_PAIRS, AKSHARE_INDICES, AKSHARE_HK_INDICES,
+    SECTOR_PAIR_TICKERS, AKSHARE_INDICES, AKSHARE_HK_INDICES,
     CACHE_DIR, CACHE_EXPIRY_HOURS
 )
 
@@ -124,9 +124,7 @@ class DataFetcher:
             tickers = list(YAHOO_INDICATORS.keys())
             tickers.extend(ROTATION_ETFS.keys())
             # 添加板块对的所有ticker
-            for category in SECTOR_PAIRS.values():
-                for pair_info in category.values():
-                    tickers.extend([pair_info[0], pair_info[1]])
+            tickers.extend(SECTOR_PAIR_TICKERS)
             tickers = list(set(tickers))
             
         cache_name = 'yahoo_data'
@@ -14,9 +14,53 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
 from typing import Dict, List, Optional, Tuple
+import functools
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
+# ==================== 评分分档表 ====================
+
+# np.searchsorted(edges, x, side='right') 得到档位，再查表取加减分
+# 实际利率 (对应 REAL_YIELD_THRESHOLDS): <0 → +20, <1% → +10, 1-2% → 0, >2% → -15
+_RY_EDGES = np.array([0.0, 1.0, np.nextafter(2.0, np.inf)])  # 利空需严格 > 2%
+_RY_DELTA = np.array([20, 10, 0, -15])
+# DXY RSI: <30 → -10, 30-70 → 0, >70 → +12
+_RSI_EDGES = np.array([30.0, np.nextafter(70.0, np.inf)])
+_RSI_DELTA = np.array([-10, 0, 12])
+
+
+# 评分因子说明模板: 因子以 (模板键, 参数...) 保存，展开明细时才格式化
+_FACTOR_TEMPLATES = {
+    'ry_negative': "✅ 负实际利率 ({:.2f}%) → 极度利好黄金 (+20)",
+    'ry_low': "✅ 低实际利率 ({:.2f}%) → 利好黄金 (+10)",
+    'ry_high': "❌ 高实际利率 ({:.2f}%) → 利空黄金 (-15)",
+    'ry_falling': "✅ 实际利率5日下降 ({:.2f}%) → 利好 (+8)",
+    'ry_rising': "❌ 实际利率5日上升 ({:.2f}%) → 利空 (-8)",
+    'dxy_overbought': "✅ DXY超买 (RSI={:.1f}) → 利好黄金 (+12)",
+    'dxy_oversold': "❌ DXY超卖 (RSI={:.1f}) → 利空黄金 (-10)",
+    'dxy_weak': "✅ DXY走弱 ({:.1f}%) → 利好 (+5)",
+    'dxy_strong': "❌ DXY走强 ({:.1f}%) → 利空 (-5)",
+    'vix_high': "✅ VIX高位 ({:.1f}) → Risk-off利好黄金 (+10)",
+    'vix_low': "⚪ VIX低位 ({:.1f}) → 风险偏好高 (-5)",
+    'corr_normal': "✅ 相关性正常 (Gold/DXY={:.2f}) → 框架有效 (+5)",
+    'corr_abnormal': "⚠️ 相关性异常 (Gold/DXY={:.2f}) → 需谨慎 (不加分)",
+}
+
+
+def format_factor(factor: Tuple) -> str:
+    """格式化评分因子 (模板键, 参数...)"""
+    key, *args = factor
+    return _FACTOR_TEMPLATES[key].format(*args)
+
+
+def _bucket_delta(edges: np.ndarray, deltas: np.ndarray, value: float) -> int:
+    """分档查表 (NaN不计分)"""
+    if np.isnan(value):
+        return 0
+    return int(deltas[np.searchsorted(edges, value, side='right')])
+
+
 # ==================== 数据类和枚举 ====================
 
 class GoldSignal(Enum):
@@ -53,6 +97,54 @@ class CorrelationStatus:
     correlation_regime: str       # 相关性体制
     regime_note: str              # 体制说明
 
+# ==================== 预警决策表 ====================
+
+# 决策在原始值上判断，键中只保留命中的分支和展示精度下的取值，
+# 相邻刷新指标未跨档/展示值不变时直接复用缓存的预警规格
+@functools.lru_cache(maxsize=2048)
+def _alerts_for_bucket(key: tuple) -> tuple:
+    """由量化后的预警键生成 (level, title, message, factors) 规格"""
+    specs = []
+    for code, *vals in key:
+        if code == "ry_negative":
+            specs.append((AlertLevel.CRITICAL, "负实际利率",
+                          f"实际利率为 {vals[0]:.2f}%，历史上这是黄金大涨的前提条件",
+                          ("实际利率 < 0", "黄金持有成本为负")))
+        elif code == "ry_falling":
+            specs.append((AlertLevel.WARNING, "实际利率快速下行",
+                          f"实际利率5日下降 {abs(vals[0]):.2f}%，利好黄金",
+                          (f"5日变化: {vals[0]:.2f}%",)))
+        elif code == "ry_rising":
+            specs.append((AlertLevel.WARNING, "实际利率快速上行",
+                          f"实际利率5日上升 {vals[0]:.2f}%，警惕黄金回调",
+                          (f"5日变化: +{vals[0]:.2f}%",)))
+        elif code == "dxy_overbought":
+            specs.append((AlertLevel.WARNING, "DXY极度超买",
+                          f"DXY RSI={vals[0]:.1f}，美元可能见顶回落，利好黄金",
+                          (f"RSI: {vals[0]:.1f}", "历史上DXY超买后常回调")))
+        elif code == "dxy_oversold":
+            specs.append((AlertLevel.WARNING, "DXY极度超卖",
+                          f"DXY RSI={vals[0]:.1f}，美元可能反弹，警惕黄金回调",
+                          (f"RSI: {vals[0]:.1f}",)))
+        elif code == "corr_abnormal":
+            specs.append((AlertLevel.WARNING, "相关性异常",
+                          f"黄金与DXY相关性为 {vals[0]:.2f}（正相关），传统框架失效",
+                          ("可能是避险需求", "可能是央行购金", "需结合其他因素判断")))
+        elif code == "div_yield_down":
+            specs.append((AlertLevel.INFO, "US10Y与DXY背离",
+                          f"收益率下跌({vals[0]:.2f}%)但美元上涨({vals[1]:.1f}%)，关注后续修正",
+                          ("收益率下跌", "美元上涨", "可能有一方会修正")))
+        elif code == "div_yield_up":
+            specs.append((AlertLevel.INFO, "US10Y与DXY背离",
+                          f"收益率上涨({vals[0]:.2f}%)但美元下跌({vals[1]:.1f}%)，关注后续修正",
+                          ("收益率上涨", "美元下跌", "可能有一方会修正")))
+        elif code == "vix_high":
+            specs.append((AlertLevel.WARNING, "VIX高位",
+                          f"VIX={vals[0]:.1f}，市场恐慌，黄金避险需求上升",
+                          (f"VIX: {vals[0]:.1f}", "Risk-off环境")))
+    return tuple(specs)
+
+
 # ==================== 核心分析器 ====================
 
 class GoldMacroAnalyzer:
@@ -89,30 +181,62 @@ class GoldMacroAnalyzer:
         yahoo = self.data.get('yahoo', pd.DataFrame())
         fred = self.data.get('fred', pd.DataFrame())
         
-        # 从Yahoo获取
-        self.gold = self._safe_extract(yahoo, ['GC=F', 'GLD'])  # 黄金期货或GLD
-        self.dxy = self._safe_extract(yahoo, ['DX-Y.NYB', 'UUP'])  # 美元指数
-        self.us10y = self._safe_extract(yahoo, ['^TNX'])  # 10年期收益率
-        self.vix = self._safe_extract(yahoo, ['^VIX'])  # VIX
-        self.tips = self._safe_extract(yahoo, ['TIP'])  # TIPS ETF代理实际利率
+        # 从Yahoo获取 (所有列一次取出)
+        yahoo_series = self._extract_columns(yahoo, {
+            'gold': ['GC=F', 'GLD'],        # 黄金期货或GLD
+            'dxy': ['DX-Y.NYB', 'UUP'],     # 美元指数
+            'us10y': ['^TNX'],              # 10年期收益率
+            'vix': ['^VIX'],                # VIX
+            'tips': ['TIP'],                # TIPS ETF代理实际利率
+        })
+        empty = pd.Series(dtype=float)
+        self.gold = yahoo_series.get('gold', empty)
+        self.dxy = yahoo_series.get('dxy', empty)
+        self.us10y = yahoo_series.get('us10y', empty)
+        self.vix = yahoo_series.get('vix', empty)
+        self.tips = yahoo_series.get('tips', empty)
         
         # 从FRED获取 (如果可用)
-        if fred is not None and not fred.empty:
-            if 'DGS10' in fred.columns:
-                self.us10y = fred['DGS10'].dropna()
-            if 'DFII10' in fred.columns:  # 10年实际利率
-                self.real_yield_fred = fred['DFII10'].dropna()
-            if 'T10YIE' in fred.columns:  # 10年盈亏平衡通胀
-                self.breakeven = fred['T10YIE'].dropna()
+        fred_series = self._extract_columns(fred, {
+            'us10y': ['DGS10'],
+            'real_yield_fred': ['DFII10'],  # 10年实际利率
+            'breakeven': ['T10YIE'],        # 10年盈亏平衡通胀
+        })
+        for name, series in fred_series.items():
+            setattr(self, name, series)
+        
+        # NumPy视图: 标量读取(arr[-k])和短窗口均值不再经过pandas索引器
+        self.gold_v = self.gold.to_numpy(dtype=np.float64)
+        self.dxy_v = self.dxy.to_numpy(dtype=np.float64)
+        self.us10y_v = self.us10y.to_numpy(dtype=np.float64)
+        self.vix_v = self.vix.to_numpy(dtype=np.float64)
+        self.tips_v = self.tips.to_numpy(dtype=np.float64)
                 
-    def _safe_extract(self, df: pd.DataFrame, possible_cols: List[str]) -> pd.Series:
-        """安全提取列"""
+    def _extract_columns(self, df: pd.DataFrame, candidates: Dict[str, List[str]]) -> Dict[str, pd.Series]:
+        """按候选列名提取去空值序列: 一次选出所有列，按NaN掩码切分"""
         if df is None or df.empty:
-            return pd.Series(dtype=float)
-        for col in possible_cols:
-            if col in df.columns:
-                return df[col].dropna()
-        return pd.Series(dtype=float)
+            return {}
+        
+        # 每个名称取第一个存在的列
+        resolved = {}
+        for name, possible_cols in candidates.items():
+            for col in possible_cols:
+                if col in df.columns:
+                    resolved[name] = col
+                    break
+        if not resolved:
+            return {}
+        
+        cols = list(dict.fromkeys(resolved.values()))
+        block = df[cols].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(block)
+        
+        extracted = {}
+        for j, col in enumerate(cols):
+            mask = valid[:, j]
+            extracted[col] = pd.Series(block[mask, j], index=df.index[mask], name=col)
+        
+        return {name: extracted[col] for name, col in resolved.items()}
     
     def calculate_real_yield(self) -> Dict:
         """计算实际利率"""
@@ -127,37 +251,42 @@ class GoldMacroAnalyzer:
         
         # 优先使用FRED的DFII10
         if hasattr(self, 'real_yield_fred') and len(self.real_yield_fred) > 0:
-            series = self.real_yield_fred
+            values = self.real_yield_fred.to_numpy(dtype=np.float64)
             result['source'] = 'FRED DFII10'
         # 其次计算: US10Y - Breakeven
         elif hasattr(self, 'breakeven') and len(self.us10y) > 0 and len(self.breakeven) > 0:
             common_idx = self.us10y.index.intersection(self.breakeven.index)
             if len(common_idx) > 0:
-                series = self.us10y.loc[common_idx] - self.breakeven.loc[common_idx]
+                values = (self.us10y.loc[common_idx] - self.breakeven.loc[common_idx]).to_numpy(dtype=np.float64)
                 result['source'] = 'US10Y - Breakeven'
             else:
                 return result
         # 最后用TIPS ETF代理
-        elif len(self.tips) > 0:
+        elif len(self.tips_v) > 0:
             # TIP价格反向代理实际利率 (TIP涨 = 实际利率跌)
-            # 简化处理：用TIP的变化率估算
-            series = -self.tips.pct_change(20) * 100  # 转换为大致的利率变化
+            # 简化处理：用TIP的20日变化率估算 (前20个点为NaN，同pct_change(20))
+            tips = self.tips_v
+            values = np.full(len(tips), np.nan)
+            values[20:] = -(tips[20:] / tips[:-20] - 1) * 100  # 转换为大致的利率变化
             result['source'] = 'TIP ETF (代理)'
         else:
             return result
         
-        if len(series) > 0:
-            result['latest'] = series.iloc[-1]
-            if len(series) >= 5:
-                result['change_5d'] = series.iloc[-1] - series.iloc[-5]
-            if len(series) >= 20:
-                result['change_20d'] = series.iloc[-1] - series.iloc[-20]
-            if len(series) >= self.lookback_days:
-                mean = series.iloc[-self.lookback_days:].mean()
-                std = series.iloc[-self.lookback_days:].std()
+        # 只用尾部切片计算统计量，不构造rolling对象
+        if len(values) > 0:
+            latest = values[-1]
+            result['latest'] = latest
+            if len(values) >= 5:
+                result['change_5d'] = latest - values[-5]
+            if len(values) >= 20:
+                result['change_20d'] = latest - values[-20]
+            if len(values) >= self.lookback_days:
+                window = values[-self.lookback_days:]
+                mean = np.nanmean(window)
+                std = np.nanstd(window, ddof=1)
                 if std > 0:
-                    result['z_score'] = (series.iloc[-1] - mean) / std
-                result['percentile'] = (series.iloc[-self.lookback_days:] <= series.iloc[-1]).mean() * 100
+                    result['z_score'] = (latest - mean) / std
+                result['percentile'] = (window <= latest).mean() * 100
                 
         return result
     
@@ -175,37 +304,36 @@ class GoldMacroAnalyzer:
         if len(self.gold) < window or len(self.dxy) < window:
             return default
             
-        # 对齐数据
-        common_idx = self.gold.index.intersection(self.dxy.index)
+        # 对齐数据: 只在尾部(3倍窗口)上求交集，交集不足时回退到全历史
+        series = [self.gold, self.dxy]
         if len(self.us10y) > 0:
-            common_idx = common_idx.intersection(self.us10y.index)
+            series.append(self.us10y)
+        has_us10y = len(self.us10y) >= window
         
-        if len(common_idx) < window:
+        aligned = self._align_tail(series, window, tail=window * 3)
+        if aligned is None:
+            aligned = self._align_tail(series, window)
+        if aligned is None:
             return default
-            
-        gold_aligned = self.gold.loc[common_idx].iloc[-window:]
-        dxy_aligned = self.dxy.loc[common_idx].iloc[-window:]
         
-        # 计算收益率
-        gold_ret = gold_aligned.pct_change().dropna()
-        dxy_ret = dxy_aligned.pct_change().dropna()
+        # 对齐后的价格矩阵: 列 = [gold, dxy, (us10y)]
+        prices = aligned if has_us10y else aligned[:, :2]
+        
+        # 计算收益率 (等价于pct_change)；np.corrcoef先去均值再做矩阵乘积，数值稳定
+        returns = prices[1:] / prices[:-1] - 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = np.atleast_2d(np.corrcoef(returns, rowvar=False))
         
         # Gold vs DXY
-        gold_dxy_corr = gold_ret.corr(dxy_ret)
+        gold_dxy_corr = corr[0, 1]
         
         # Gold vs US10Y
         gold_us10y_corr = np.nan
         dxy_us10y_corr = np.nan
         
-        if len(self.us10y) >= window:
-            us10y_aligned = self.us10y.loc[common_idx].iloc[-window:]
-            us10y_ret = us10y_aligned.pct_change().dropna()
-            
-            # 重新对齐
-            common_ret_idx = gold_ret.index.intersection(us10y_ret.index)
-            if len(common_ret_idx) > 10:
-                gold_us10y_corr = gold_ret.loc[common_ret_idx].corr(us10y_ret.loc[common_ret_idx])
-                dxy_us10y_corr = dxy_ret.loc[common_ret_idx].corr(us10y_ret.loc[common_ret_idx])
+        if has_us10y and len(returns) > 10:
+            gold_us10y_corr = corr[0, 2]
+            dxy_us10y_corr = corr[1, 2]
         
         # 判断相关性体制
         regime, note = self._determine_correlation_regime(gold_dxy_corr, gold_us10y_corr)
@@ -218,6 +346,19 @@ class GoldMacroAnalyzer:
             regime_note=note
         )
     
+    @staticmethod
+    def _align_tail(series: List[pd.Series], window: int, tail: int = None) -> Optional[np.ndarray]:
+        """按共同日期对齐，返回最后window行的价格矩阵 (不足window行返回None)"""
+        if tail is not None:
+            series = [s.iloc[-tail:] for s in series]
+        common_idx = series[0].index
+        for s in series[1:]:
+            common_idx = common_idx.intersection(s.index)
+        if len(common_idx) < window:
+            return None
+        common_idx = common_idx[-window:]
+        return np.column_stack([s.loc[common_idx].to_numpy(dtype=np.float64) for s in series])
+    
     def _determine_correlation_regime(self, gold_dxy: float, gold_us10y: float) -> Tuple[str, str]:
         """判断相关性体制"""
         if np.isnan(gold_dxy):
@@ -233,19 +374,27 @@ class GoldMacroAnalyzer:
         else:
             return "异常", "⚠️ 黄金与美元同向移动，可能是避险需求或央行购金"
     
+    @staticmethod
+    def _pct_change(v: np.ndarray, back: int) -> float:
+        """v[-1] 相对 v[-back] 的涨跌幅(%)，长度不足或基数为0时返回0"""
+        if len(v) < back or v[-back] == 0:
+            return 0
+        return (v[-1] / v[-back] - 1) * 100
+    
     def calculate_indicators(self) -> Dict:
         """计算所有指标"""
         indicators = {}
         
         # 1. 黄金价格指标
-        if len(self.gold) > 0:
+        g = self.gold_v
+        if len(g) > 0:
             indicators['gold'] = {
-                'latest': self.gold.iloc[-1],
-                'change_1d': self.gold.pct_change().iloc[-1] * 100 if len(self.gold) > 1 else 0,
-                'change_5d': (self.gold.iloc[-1] / self.gold.iloc[-5] - 1) * 100 if len(self.gold) >= 5 else 0,
-                'change_20d': (self.gold.iloc[-1] / self.gold.iloc[-20] - 1) * 100 if len(self.gold) >= 20 else 0,
-                'ma20': self.gold.rolling(20).mean().iloc[-1] if len(self.gold) >= 20 else self.gold.iloc[-1],
-                'ma50': self.gold.rolling(50).mean().iloc[-1] if len(self.gold) >= 50 else self.gold.iloc[-1],
+                'latest': g[-1],
+                'change_1d': self._pct_change(g, 2),
+                'change_5d': self._pct_change(g, 5),
+                'change_20d': self._pct_change(g, 20),
+                'ma20': g[-20:].mean() if len(g) >= 20 else g[-1],
+                'ma50': g[-50:].mean() if len(g) >= 50 else g[-1],
             }
             # 判断趋势
             if indicators['gold']['latest'] > indicators['gold']['ma20'] > indicators['gold']['ma50']:
@@ -259,12 +408,12 @@ class GoldMacroAnalyzer:
                 indicators['gold']['trend_emoji'] = "↔️"
         
         # 2. DXY指标
-        if len(self.dxy) > 0:
-            dxy_series = self.dxy
+        d = self.dxy_v
+        if len(d) > 0:
             indicators['dxy'] = {
-                'latest': dxy_series.iloc[-1],
-                'change_5d': (dxy_series.iloc[-1] / dxy_series.iloc[-5] - 1) * 100 if len(dxy_series) >= 5 else 0,
-                'rsi_14': self._calculate_rsi(dxy_series, 14),
+                'latest': d[-1],
+                'change_5d': self._pct_change(d, 5),
+                'rsi_14': self._calculate_rsi(self.dxy, 14),
             }
             # RSI判断
             rsi = indicators['dxy']['rsi_14']
@@ -279,12 +428,12 @@ class GoldMacroAnalyzer:
                 indicators['dxy']['rsi_emoji'] = "⚪"
         
         # 3. US10Y指标
-        if len(self.us10y) > 0:
-            us10y_series = self.us10y
+        y = self.us10y_v
+        if len(y) > 0:
             indicators['us10y'] = {
-                'latest': us10y_series.iloc[-1],
-                'change_5d': us10y_series.iloc[-1] - us10y_series.iloc[-5] if len(us10y_series) >= 5 else 0,
-                'change_20d': us10y_series.iloc[-1] - us10y_series.iloc[-20] if len(us10y_series) >= 20 else 0,
+                'latest': y[-1],
+                'change_5d': y[-1] - y[-5] if len(y) >= 5 else 0,
+                'change_20d': y[-1] - y[-20] if len(y) >= 20 else 0,
             }
             # 方向判断
             if indicators['us10y']['change_5d'] > 0.05:
@@ -304,10 +453,11 @@ class GoldMacroAnalyzer:
         indicators['correlations'] = self.calculate_correlations(30)
         
         # 6. VIX
-        if len(self.vix) > 0:
+        if len(self.vix_v) > 0:
+            vix_latest = self.vix_v[-1]
             indicators['vix'] = {
-                'latest': self.vix.iloc[-1],
-                'level': 'high' if self.vix.iloc[-1] > 25 else 'low' if self.vix.iloc[-1] < 15 else 'normal'
+                'latest': vix_latest,
+                'level': 'high' if vix_latest > 25 else 'low' if vix_latest < 15 else 'normal'
             }
         
         self.indicators = indicators
@@ -318,87 +468,114 @@ class GoldMacroAnalyzer:
         if len(series) < period + 1:
             return 50.0
         
-        delta = series.diff()
-        gain = delta.where(delta > 0, 0).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi.iloc[-1] if not np.isnan(rsi.iloc[-1]) else 50.0
+        # 只需最后一个值: 直接对最近period个差分求均值，避免构造两条rolling序列
+        delta = np.diff(np.asarray(series.values[-(period + 1):], dtype=np.float64))
+        gain = np.where(delta > 0, delta, 0.0).mean()
+        loss = np.where(delta < 0, -delta, 0.0).mean()
+
+        if loss == 0:
+            return 100.0 if gain > 0 else 50.0
+
+        rsi = 100 - (100 / (1 + gain / loss))
+
+        return rsi if not np.isnan(rsi) else 50.0
     
-    def calculate_composite_score(self) -> Dict:
-        """计算黄金综合评分 (0-100, 50为中性)"""
+    def _read_inputs(self) -> Dict:
+        """一次读取评分/预警/建议所需的全部指标值，缺失值按NaN处理"""
         if not self.indicators:
             self.calculate_indicators()
         
-        score = 50  # 起始中性
-        factors = []
-        
-        # 1. 实际利率因子 (权重 40%)
         real_yield = self.indicators.get('real_yield', {})
-        ry_latest = real_yield.get('latest')
-        
-        if ry_latest is not None and not np.isnan(ry_latest):
-            if ry_latest < 0:
-                score += 20
-                factors.append(f"✅ 负实际利率 ({ry_latest:.2f}%) → 极度利好黄金 (+20)")
-            elif ry_latest < 1.0:
-                score += 10
-                factors.append(f"✅ 低实际利率 ({ry_latest:.2f}%) → 利好黄金 (+10)")
-            elif ry_latest > 2.0:
-                score -= 15
-                factors.append(f"❌ 高实际利率 ({ry_latest:.2f}%) → 利空黄金 (-15)")
-            
-            # 变化方向
-            ry_change = real_yield.get('change_5d', 0)
-            if ry_change is not None and not np.isnan(ry_change):
-                if ry_change < -0.1:
-                    score += 8
-                    factors.append(f"✅ 实际利率5日下降 ({ry_change:.2f}%) → 利好 (+8)")
-                elif ry_change > 0.15:
-                    score -= 8
-                    factors.append(f"❌ 实际利率5日上升 ({ry_change:.2f}%) → 利空 (-8)")
-        
-        # 2. DXY因子 (权重 25%)
         dxy = self.indicators.get('dxy', {})
-        dxy_rsi = dxy.get('rsi_14', 50)
-        
-        if dxy_rsi > 70:
-            score += 12
-            factors.append(f"✅ DXY超买 (RSI={dxy_rsi:.1f}) → 利好黄金 (+12)")
-        elif dxy_rsi < 30:
-            score -= 10
-            factors.append(f"❌ DXY超卖 (RSI={dxy_rsi:.1f}) → 利空黄金 (-10)")
-        
-        dxy_change = dxy.get('change_5d', 0)
-        if dxy_change < -1:
-            score += 5
-            factors.append(f"✅ DXY走弱 ({dxy_change:.1f}%) → 利好 (+5)")
-        elif dxy_change > 1:
-            score -= 5
-            factors.append(f"❌ DXY走强 ({dxy_change:.1f}%) → 利空 (-5)")
-        
-        # 3. VIX因子 (权重 20%)
         vix = self.indicators.get('vix', {})
-        vix_level = vix.get('level', 'normal')
-        vix_latest = vix.get('latest', 20)
+        us10y = self.indicators.get('us10y', {})
+        corr = self.indicators.get('correlations')
         
-        if vix_level == 'high':
-            score += 10
-            factors.append(f"✅ VIX高位 ({vix_latest:.1f}) → Risk-off利好黄金 (+10)")
-        elif vix_level == 'low':
-            score -= 5
-            factors.append(f"⚪ VIX低位 ({vix_latest:.1f}) → 风险偏好高 (-5)")
+        ry_latest = real_yield.get('latest')
+        ry_change = real_yield.get('change_5d', 0)
+        ry_valid = ry_latest is not None and not np.isnan(ry_latest)
+        corr_valid = bool(corr) and not np.isnan(corr.gold_dxy_corr)
         
-        # 4. 相关性状态因子 (权重 15%)
-        corr = self.indicators.get('correlations')
-        if corr and not np.isnan(corr.gold_dxy_corr):
+        return {
+            'ry_latest': ry_latest if ry_valid else np.nan,
+            'ry_change': ry_change if ry_valid and ry_change is not None else np.nan,
+            'dxy_rsi': dxy.get('rsi_14', 50),
+            'dxy_change': dxy.get('change_5d', 0),
+            'us10y_change': us10y.get('change_5d', 0),
+            'vix_level': vix.get('level', 'normal'),
+            'vix_latest': vix.get('latest', 20),
+            'corr': corr if corr_valid else None,
+            'corr_status': corr,
+            'gold': self.indicators.get('gold', {}),
+        }
+    
+    def _score_contributions(self, inputs: Dict) -> np.ndarray:
+        """各评分因子的加减分 (np.select向量化求值)，NaN不计分"""
+        ry, ry_chg, rsi, dxy_chg = np.array(
+            [inputs['ry_latest'], inputs['ry_change'], inputs['dxy_rsi'], inputs['dxy_change']],
+            dtype=np.float64,
+        )
+        corr = inputs['corr']
+        
+        return np.array([
+            # 1. 实际利率因子 (权重 40%)
+            _bucket_delta(_RY_EDGES, _RY_DELTA, ry),
+            np.select([ry_chg < -0.1, ry_chg > 0.15], [8, -8], default=0),
+            # 2. DXY因子 (权重 25%)
+            _bucket_delta(_RSI_EDGES, _RSI_DELTA, rsi),
+            np.select([dxy_chg < -1, dxy_chg > 1], [5, -5], default=0),
+            # 3. VIX因子 (权重 20%)
+            np.select([inputs['vix_level'] == 'high', inputs['vix_level'] == 'low'], [10, -5], default=0),
+            # 4. 相关性状态因子 (权重 15%)
+            5 if corr is not None and corr.correlation_regime == "正常" else 0,
+        ], dtype=np.int64)
+    
+    def _score_factors(self, contributions: np.ndarray, inputs: Dict) -> List[Tuple]:
+        """生成评分因子 (模板键, 参数...)，显示时再用format_factor格式化"""
+        factors = []
+        ry_delta, ry_chg_delta, rsi_delta, dxy_delta, vix_delta, _ = contributions
+        corr = inputs['corr']
+        
+        if ry_delta == 20:
+            factors.append(('ry_negative', inputs['ry_latest']))
+        elif ry_delta == 10:
+            factors.append(('ry_low', inputs['ry_latest']))
+        elif ry_delta == -15:
+            factors.append(('ry_high', inputs['ry_latest']))
+        
+        if ry_chg_delta > 0:
+            factors.append(('ry_falling', inputs['ry_change']))
+        elif ry_chg_delta < 0:
+            factors.append(('ry_rising', inputs['ry_change']))
+        
+        if rsi_delta > 0:
+            factors.append(('dxy_overbought', inputs['dxy_rsi']))
+        elif rsi_delta < 0:
+            factors.append(('dxy_oversold', inputs['dxy_rsi']))
+        
+        if dxy_delta > 0:
+            factors.append(('dxy_weak', inputs['dxy_change']))
+        elif dxy_delta < 0:
+            factors.append(('dxy_strong', inputs['dxy_change']))
+        
+        if vix_delta > 0:
+            factors.append(('vix_high', inputs['vix_latest']))
+        elif vix_delta < 0:
+            factors.append(('vix_low', inputs['vix_latest']))
+        
+        if corr is not None:
             if corr.correlation_regime == "正常":
-                score += 5
-                factors.append(f"✅ 相关性正常 (Gold/DXY={corr.gold_dxy_corr:.2f}) → 框架有效 (+5)")
+                factors.append(('corr_normal', corr.gold_dxy_corr))
             elif corr.correlation_regime == "异常":
-                factors.append(f"⚠️ 相关性异常 (Gold/DXY={corr.gold_dxy_corr:.2f}) → 需谨慎 (不加分)")
+                factors.append(('corr_abnormal', corr.gold_dxy_corr))
+        
+        return factors
+    
+    def _build_score_data(self, inputs: Dict, explain: bool = True) -> Dict:
+        """由指标值计算综合评分和信号"""
+        contributions = self._score_contributions(inputs)
+        score = 50 + int(contributions.sum())  # 起始中性
+        factors = self._score_factors(contributions, inputs) if explain else []
         
         # 限制范围
         score = max(0, min(100, score))
@@ -422,6 +599,10 @@ class GoldMacroAnalyzer:
             'interpretation': self._get_score_interpretation(score)
         }
     
+    def calculate_composite_score(self, explain: bool = True) -> Dict:
+        """计算黄金综合评分 (0-100, 50为中性); explain=False时跳过因子说明文字"""
+        return self._build_score_data(self._read_inputs(), explain)
+    
     def _get_score_interpretation(self, score: float) -> str:
         """获取评分解读"""
         if score >= 75:
@@ -435,113 +616,68 @@ class GoldMacroAnalyzer:
         else:
             return "极度利空 - 多因子共振做空信号"
     
-    def generate_alerts(self) -> List[GoldAlert]:
-        """生成预警信号"""
-        if not self.indicators:
-            self.calculate_indicators()
-        
-        alerts = []
+    def _build_alerts(self, inputs: Dict) -> List[GoldAlert]:
+        """由指标值生成预警信号"""
+        key = []
         
         # 1. 实际利率预警
-        real_yield = self.indicators.get('real_yield', {})
-        ry_latest = real_yield.get('latest')
-        ry_change = real_yield.get('change_5d', 0)
+        ry_latest = inputs['ry_latest']
+        ry_change = inputs['ry_change']
         
-        if ry_latest is not None and not np.isnan(ry_latest):
+        if not np.isnan(ry_latest):
             if ry_latest < 0:
-                alerts.append(GoldAlert(
-                    level=AlertLevel.CRITICAL,
-                    title="负实际利率",
-                    message=f"实际利率为 {ry_latest:.2f}%，历史上这是黄金大涨的前提条件",
-                    factors=["实际利率 < 0", "黄金持有成本为负"]
-                ))
+                key.append(("ry_negative", round(float(ry_latest), 2)))
             
-            if ry_change is not None and not np.isnan(ry_change):
+            if not np.isnan(ry_change):
                 if ry_change < -0.15:
-                    alerts.append(GoldAlert(
-                        level=AlertLevel.WARNING,
-                        title="实际利率快速下行",
-                        message=f"实际利率5日下降 {abs(ry_change):.2f}%，利好黄金",
-                        factors=[f"5日变化: {ry_change:.2f}%"]
-                    ))
+                    key.append(("ry_falling", round(float(ry_change), 2)))
                 elif ry_change > 0.2:
-                    alerts.append(GoldAlert(
-                        level=AlertLevel.WARNING,
-                        title="实际利率快速上行",
-                        message=f"实际利率5日上升 {ry_change:.2f}%，警惕黄金回调",
-                        factors=[f"5日变化: +{ry_change:.2f}%"]
-                    ))
+                    key.append(("ry_rising", round(float(ry_change), 2)))
         
         # 2. DXY预警
-        dxy = self.indicators.get('dxy', {})
-        dxy_rsi = dxy.get('rsi_14', 50)
+        dxy_rsi = inputs['dxy_rsi']
         
         if dxy_rsi > 75:
-            alerts.append(GoldAlert(
-                level=AlertLevel.WARNING,
-                title="DXY极度超买",
-                message=f"DXY RSI={dxy_rsi:.1f}，美元可能见顶回落，利好黄金",
-                factors=[f"RSI: {dxy_rsi:.1f}", "历史上DXY超买后常回调"]
-            ))
+            key.append(("dxy_overbought", round(float(dxy_rsi), 1)))
         elif dxy_rsi < 25:
-            alerts.append(GoldAlert(
-                level=AlertLevel.WARNING,
-                title="DXY极度超卖",
-                message=f"DXY RSI={dxy_rsi:.1f}，美元可能反弹，警惕黄金回调",
-                factors=[f"RSI: {dxy_rsi:.1f}"]
-            ))
+            key.append(("dxy_oversold", round(float(dxy_rsi), 1)))
         
         # 3. 相关性异常预警
-        corr = self.indicators.get('correlations')
+        corr = inputs['corr_status']
         if corr and corr.correlation_regime == "异常":
-            alerts.append(GoldAlert(
-                level=AlertLevel.WARNING,
-                title="相关性异常",
-                message=f"黄金与DXY相关性为 {corr.gold_dxy_corr:.2f}（正相关），传统框架失效",
-                factors=["可能是避险需求", "可能是央行购金", "需结合其他因素判断"]
-            ))
+            key.append(("corr_abnormal", round(float(corr.gold_dxy_corr), 2)))
         
         # 4. US10Y与DXY背离预警
-        us10y = self.indicators.get('us10y', {})
-        us10y_change = us10y.get('change_5d', 0)
-        dxy_change = dxy.get('change_5d', 0)
+        us10y_change = inputs['us10y_change']
+        dxy_change = inputs['dxy_change']
         
         if us10y_change is not None and dxy_change is not None:
             if us10y_change < -0.1 and dxy_change > 0.5:
-                alerts.append(GoldAlert(
-                    level=AlertLevel.INFO,
-                    title="US10Y与DXY背离",
-                    message=f"收益率下跌({us10y_change:.2f}%)但美元上涨({dxy_change:.1f}%)，关注后续修正",
-                    factors=["收益率下跌", "美元上涨", "可能有一方会修正"]
-                ))
+                key.append(("div_yield_down", round(float(us10y_change), 2), round(float(dxy_change), 1)))
             elif us10y_change > 0.1 and dxy_change < -0.5:
-                alerts.append(GoldAlert(
-                    level=AlertLevel.INFO,
-                    title="US10Y与DXY背离",
-                    message=f"收益率上涨({us10y_change:.2f}%)但美元下跌({dxy_change:.1f}%)，关注后续修正",
-                    factors=["收益率上涨", "美元下跌", "可能有一方会修正"]
-                ))
+                key.append(("div_yield_up", round(float(us10y_change), 2), round(float(dxy_change), 1)))
         
         # 5. VIX预警
-        vix = self.indicators.get('vix', {})
-        vix_latest = vix.get('latest', 20)
+        vix_latest = inputs['vix_latest']
         
         if vix_latest > 30:
-            alerts.append(GoldAlert(
-                level=AlertLevel.WARNING,
-                title="VIX高位",
-                message=f"VIX={vix_latest:.1f}，市场恐慌，黄金避险需求上升",
-                factors=[f"VIX: {vix_latest:.1f}", "Risk-off环境"]
-            ))
-        
-        return alerts
+            key.append(("vix_high", round(float(vix_latest), 1)))
+        
+        # 同一批预警共享一个时间戳，缓存的只是不可变的规格
+        specs = _alerts_for_bucket(tuple(key))
+        if not specs:
+            return []
+        now = datetime.now()
+        return [GoldAlert(level=level, title=title, message=message,
+                          factors=list(factors), timestamp=now)
+                for level, title, message, factors in specs]
     
-    def get_trading_suggestions(self) -> Dict:
-        """获取交易建议"""
-        if not self.indicators:
-            self.calculate_indicators()
-        
-        score_data = self.calculate_composite_score()
+    def generate_alerts(self) -> List[GoldAlert]:
+        """生成预警信号"""
+        return self._build_alerts(self._read_inputs())
+    
+    def _build_suggestions(self, score_data: Dict, inputs: Dict) -> Dict:
+        """由评分结果和指标值生成交易建议"""
         score = score_data['score']
         signal = score_data['signal']
         
@@ -554,7 +690,7 @@ class GoldMacroAnalyzer:
         }
         
         # 获取黄金价格
-        gold = self.indicators.get('gold', {})
+        gold = inputs['gold']
         gold_price = gold.get('latest', 0)
         gold_ma20 = gold.get('ma20', 0)
         gold_ma50 = gold.get('ma50', 0)
@@ -599,15 +735,72 @@ class GoldMacroAnalyzer:
             ]
         
         # 风险因素
-        corr = self.indicators.get('correlations')
+        corr = inputs['corr_status']
         if corr and corr.correlation_regime == "异常":
             suggestions['risk_factors'].append("⚠️ 相关性异常，传统框架可能失效")
         
-        real_yield = self.indicators.get('real_yield', {})
-        if real_yield.get('latest', 0) > 2:
+        if inputs['ry_latest'] > 2:
             suggestions['risk_factors'].append("⚠️ 高实际利率环境不利于黄金")
         
         return suggestions
+    
+    def get_trading_suggestions(self) -> Dict:
+        """获取交易建议"""
+        inputs = self._read_inputs()
+        return self._build_suggestions(self._build_score_data(inputs, explain=False), inputs)
+    
+    def _analyze_all(self, explain: bool = True) -> Dict:
+        """融合分析: 指标值只读取一次，同时生成评分、预警和交易建议"""
+        inputs = self._read_inputs()
+        score_data = self._build_score_data(inputs, explain)
+        return {
+            'score_data': score_data,
+            'alerts': self._build_alerts(inputs),
+            'suggestions': self._build_suggestions(score_data, inputs),
+        }
+
+
+# ==================== 分析结果缓存 ====================
+
+# Streamlit每次rerun都会重新调用渲染函数；数据未变化时直接复用分析结果
+_ANALYSIS_CACHE: Dict[tuple, Tuple[float, Dict]] = {}
+_ANALYSIS_CACHE_TTL = 300  # 秒
+_ANALYSIS_CACHE_MAX_ENTRIES = 32
+
+
+def _data_fingerprint(df: pd.DataFrame) -> Optional[tuple]:
+    """数据指纹: 形状 + 列 + 最后日期 + 最后一行数值和"""
+    if df is None or df.empty:
+        return None
+    return (
+        df.shape,
+        tuple(df.columns),
+        df.index[-1],
+        float(np.nansum(df.iloc[-1].to_numpy(dtype=np.float64, na_value=np.nan))),
+    )
+
+
+def analyze_gold(yahoo_data: pd.DataFrame, fred_data: pd.DataFrame = None,
+                 lookback_days: int = 60) -> Dict:
+    """运行完整黄金分析 (按数据指纹缓存)"""
+    key = (_data_fingerprint(yahoo_data), _data_fingerprint(fred_data), lookback_days)
+    now = time.time()
+    
+    cached = _ANALYSIS_CACHE.get(key)
+    if cached is not None and now - cached[0] < _ANALYSIS_CACHE_TTL:
+        return cached[1]
+    
+    analyzer = GoldMacroAnalyzer(lookback_days=lookback_days)
+    analyzer.load_data(yahoo_data, fred_data)
+    result = {'indicators': analyzer.calculate_indicators()}
+    result.update(analyzer._analyze_all())
+    
+    if len(_ANALYSIS_CACHE) >= _ANALYSIS_CACHE_MAX_ENTRIES:
+        # 淘汰最早写入的条目
+        oldest = min(_ANALYSIS_CACHE, key=lambda k: _ANALYSIS_CACHE[k][0])
+        del _ANALYSIS_CACHE[oldest]
+    _ANALYSIS_CACHE[key] = (now, result)
+    return result
 
 
 # ==================== Streamlit 渲染函数 ====================
@@ -621,9 +814,6 @@ def render_gold_alert_section(all_data: Dict, indicators: Dict = None):
     st.markdown('<div class="chapter-header">🥇 黄金宏观预警</div>', unsafe_allow_html=True)
     st.markdown('*"实际利率+美元+避险三因子监控"*')
     
-    # 初始化分析器
-    analyzer = GoldMacroAnalyzer()
-    
     yahoo_data = all_data.get('yahoo', pd.DataFrame())
     fred_data = all_data.get('fred', pd.DataFrame())
     
@@ -631,17 +821,17 @@ def render_gold_alert_section(all_data: Dict, indicators: Dict = None):
         st.warning("Yahoo数据不可用，黄金分析功能受限")
         return
     
-    analyzer.load_data(yahoo_data, fred_data)
-    gold_indicators = analyzer.calculate_indicators()
-    score_data = analyzer.calculate_composite_score()
-    alerts = analyzer.generate_alerts()
-    suggestions = analyzer.get_trading_suggestions()
+    analysis = analyze_gold(yahoo_data, fred_data)
+    gold_indicators = analysis['indicators']
+    score_data = analysis['score_data']
+    alerts = analysis['alerts']
+    suggestions = analysis['suggestions']
     
     # ========== 评分和信号 ==========
-    col1, col2, col3 = st.columns([1, 1, 2])
+    col1, col3 = st.columns([2, 2])
     
     with col1:
-        # 评分仪表盘
+        # 评分仪表盘 + 关键指标合并为一张图，单次下发
         score = score_data['score']
         signal = score_data['signal']
         
@@ -653,10 +843,19 @@ def render_gold_alert_section(all_data: Dict, indicators: Dict = None):
         else:
             color = '#FF6347'  # 红色
         
-        fig_gauge = go.Figure(go.Indicator(
+        gold = gold_indicators.get('gold', {})
+        real_yield = gold_indicators.get('real_yield', {})
+        dxy = gold_indicators.get('dxy', {})
+        
+        fig_panel = make_subplots(
+            rows=1, cols=4,
+            column_widths=[0.34, 0.22, 0.22, 0.22],
+            specs=[[{'type': 'indicator'}] * 4]
+        )
+        
+        fig_panel.add_trace(go.Indicator(
             mode="gauge+number",
             value=score,
-            domain={'x': [0, 1], 'y': [0, 1]},
             title={'text': "黄金宏观评分", 'font': {'size': 16, 'color': 'white'}},
             number={'font': {'size': 36, 'color': 'white'}},
             gauge={
@@ -673,9 +872,42 @@ def render_gold_alert_section(all_data: Dict, indicators: Dict = None):
                     {'range': [75, 100], 'color': 'rgba(255,215,0,0.3)'},
                 ],
             }
-        ))
-        
-        fig_gauge.update_layout(
+        ), row=1, col=1)
+        
+        # 黄金: 5日涨跌幅以相对 delta 展示
+        gold_latest = gold.get('latest', 0)
+        gold_chg = gold.get('change_5d', 0)
+        fig_panel.add_trace(go.Indicator(
+            mode="number+delta",
+            value=gold_latest,
+            title={'text': "黄金 (GC/GLD)<br><span style='font-size:0.7em'>5d</span>", 'font': {'size': 14}},
+            number={'prefix': "$", 'valueformat': ".0f", 'font': {'size': 28}},
+            delta={'reference': gold_latest / (1 + gold_chg / 100), 'relative': True, 'valueformat': ".1%"}
+        ), row=1, col=2)
+        
+        # 实际利率: 上行利空黄金，颜色反转
+        ry_val = real_yield.get('latest', 0)
+        ry_chg = real_yield.get('change_5d')
+        ry_ok = ry_val is not None and not np.isnan(ry_val)
+        fig_panel.add_trace(go.Indicator(
+            mode="number+delta" if ry_ok and ry_chg else "number",
+            value=ry_val if ry_ok else None,
+            title={'text': "实际利率" + ("<br><span style='font-size:0.7em'>5d</span>" if ry_ok else "<br>N/A"),
+                   'font': {'size': 14}},
+            number={'suffix': "%", 'valueformat': ".2f", 'font': {'size': 28}},
+            delta={'reference': ry_val - ry_chg if ry_ok and ry_chg else 0, 'valueformat': ".2f",
+                   'increasing': {'color': '#FF1744'}, 'decreasing': {'color': '#00C853'}}
+        ), row=1, col=3)
+        
+        fig_panel.add_trace(go.Indicator(
+            mode="number",
+            value=dxy.get('latest', 0),
+            title={'text': f"DXY<br><span style='font-size:0.7em'>RSI: {dxy.get('rsi_14', 50):.0f} "
+                           f"{dxy.get('rsi_emoji', '')}</span>", 'font': {'size': 14}},
+            number={'valueformat': ".1f", 'font': {'size': 28}}
+        ), row=1, col=4)
+        
+        fig_panel.update_layout(
             paper_bgcolor='rgba(0,0,0,0)',
             plot_bgcolor='rgba(0,0,0,0)',
             font={'color': 'white'},
@@ -683,7 +915,7 @@ def render_gold_alert_section(all_data: Dict, indicators: Dict = None):
             margin=dict(l=20, r=20, t=40, b=20)
         )
         
-        st.plotly_chart(fig_gauge, use_container_width=True)
+        st.plotly_chart(fig_panel, use_container_width=True)
         
         # 信号显示
         signal_colors = {
@@ -696,33 +928,6 @@ def render_gold_alert_section(all_data: Dict, indicators: Dict = None):
         emoji, _ = signal_colors.get(signal, ('⚪', '#808080'))
         st.markdown(f"**信号: {emoji} {signal.value}**")
     
-    with col2:
-        # 关键指标
-        gold = gold_indicators.get('gold', {})
-        real_yield = gold_indicators.get('real_yield', {})
-        dxy = gold_indicators.get('dxy', {})
-        
-        st.metric(
-            "黄金 (GC/GLD)",
-            f"${gold.get('latest', 0):.0f}",
-            f"{gold.get('change_5d', 0):.1f}% (5d)"
-        )
-        
-        ry_val = real_yield.get('latest', 0)
-        ry_str = f"{ry_val:.2f}%" if ry_val is not None and not np.isnan(ry_val) else "N/A"
-        st.metric(
-            "实际利率",
-            ry_str,
-            f"5d: {real_yield.get('change_5d', 0):.2f}%" if real_yield.get('change_5d') else None,
-            delta_color="inverse"
-        )
-        
-        st.metric(
-            "DXY",
-            f"{dxy.get('latest', 0):.1f}",
-            f"RSI: {dxy.get('rsi_14', 50):.0f} {dxy.get('rsi_emoji', '')}"
-        )
-    
     with col3:
         # 相关性状态
         corr = gold_indicators.get('correlations')
@@ -768,7 +973,7 @@ def render_gold_alert_section(all_data: Dict, indicators: Dict = None):
     # ========== 评分因子 ==========
     with st.expander("📋 评分因子明细", expanded=False):
         for factor in score_data['factors']:
-            st.markdown(f"- {factor}")
+            st.markdown(f"- {format_factor(factor)}")
         st.markdown(f"\n**解读:** {score_data['interpretation']}")
     
     # ========== 交易建议 ==========
@@ -833,18 +1038,16 @@ def render_gold_alert_section(all_data: Dict, indicators: Dict = None):
 
 def get_gold_summary_for_prompt(all_data: Dict) -> str:
     """生成黄金分析摘要 - 用于Claude导出"""
-    analyzer = GoldMacroAnalyzer()
-    
     yahoo_data = all_data.get('yahoo', pd.DataFrame())
     fred_data = all_data.get('fred', pd.DataFrame())
     
     if yahoo_data.empty:
         return "黄金数据不可用"
     
-    analyzer.load_data(yahoo_data, fred_data)
-    indicators = analyzer.calculate_indicators()
-    score_data = analyzer.calculate_composite_score()
-    alerts = analyzer.generate_alerts()
+    analysis = analyze_gold(yahoo_data, fred_data)
+    indicators = analysis['indicators']
+    score_data = analysis['score_data']
+    alerts = analysis['alerts']
     
     summary_lines = [
         "## 🥇 黄金宏观分析",
@@ -4,13 +4,353 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import glob
+import hashlib
+import os
+import pickle
+import sys
 
+import config
 from config import (
     ZSCORE_WINDOWS, TREND_MA_PERIODS, RS_PERIOD,
-    SECTOR_PAIRS, CURRENT_FED_RATE, CURRENT_BOJ_RATE,
-    ALERT_THRESHOLDS, get_zscore_signal
+    SECTOR_PAIR_LIST, CURRENT_FED_RATE, CURRENT_BOJ_RATE,
+    ALERT_THRESHOLDS, CACHE_DIR, get_zscore_signal
 )
 
+# 指标结果磁盘缓存: 键中包含本模块与config的源码哈希，计算逻辑或阈值改动后旧缓存自动失效
+_INDICATOR_CACHE_PREFIX = 'indicators_'
+
+
+def _source_hash(*modules):
+    """模块源码的SHA-256 (用于缓存键)"""
+    h = hashlib.sha256()
+    for module in modules:
+        with open(module.__file__, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+_INDICATOR_CODE_HASH = _source_hash(sys.modules[__name__], config)
+
+# ==================== 分档标签表 ====================
+
+# 边界按 searchsorted(side='right') 使用: value < edges[0] 落在第0档；
+# 原逻辑中的 "> x" 用 nextafter(x) 作为边界，使 value == x 留在下一档
+_CURVE_EDGES = np.array([-0.5, 0.0, 0.5])
+_CURVE_LABELS = ('深度倒挂', '倒挂', '平坦', '陡峭')
+
+_FED_EDGES = np.array([-0.75, -0.25, np.nextafter(0.25, np.inf)])
+_FED_LABELS = ('鸽派 (市场预期多次降息)', '偏鸽 (市场预期降息)', '中性', '偏鹰 (市场预期加息)')
+
+_BOJ_EDGES = np.array([-3.0, -1.0, np.nextafter(3.0, np.inf)])
+_BOJ_LABELS = ('鹰派信号 (日元走强)', '偏鹰 (日元小幅走强)', '中性', '鸽派信号 (日元走弱)')
+
+_CARRY_EDGES = np.array([-3.0, -1.0])
+_CARRY_LABELS = ('高', '中', '低')
+
+# 经济周期四象限: 下标 = 2 * (增长动量 > 1) + (通胀动量 >= 5)
+# (周期, 描述, 有利资产, 不利资产)
+_CYCLES = (
+    ('衰退/放缓', '增长放缓 + 通胀回落', ('长期国债', '黄金', '防御板块', '高质量'), ('周期股', '小盘股', '新兴市场', '商品')),
+    ('滞胀', '增长放缓 + 通胀顽固', ('商品', '黄金', '现金', '短久期'), ('股票', '长期债券', '成长股')),
+    ('复苏', '增长回升 + 通胀温和', ('小盘股', '周期股', '铜', '新兴市场', '金融'), ('长期国债', '防御板块', '黄金')),
+    ('扩张/过热', '增长强劲 + 通胀升温', ('商品', '能源', '价值股', '周期股'), ('长久期资产', '成长股', '债券')),
+)
+
+# 相关性状态
+_CORR_STATUS_HIGH = '🔴 异常高'
+_CORR_STATUS_LOW = '🔴 异常低'
+_CORR_STATUS_OK = '🟢 正常'
+_CORR_OK_INTERPRETATION = '在历史正常范围内'
+# 状态码 -> (状态, 解读键)，正常状态使用统一解读
+_CORR_STATUS_CODES = (
+    (_CORR_STATUS_HIGH, 'high'),
+    (_CORR_STATUS_LOW, 'low'),
+    (_CORR_STATUS_OK, None),
+)
+
+# RS动量四象限 (RS Z-Score 正/负 × 5日变化 升/降)
+_RS_QUADRANTS = (('加速上涨', '🚀'), ('上涨减速', '⚠️'), ('下跌减速', '🔄'), ('加速下跌', '📉'))
+
+
+def _bucket_label(edges, labels, value, default):
+    """按分档边界取标签，NaN返回 default；value 也可以是数组，返回标签数组"""
+    if np.ndim(value) == 0:
+        if np.isnan(value):
+            return default
+        return labels[int(np.searchsorted(edges, value, side='right'))]
+    value = np.asarray(value, dtype=np.float64)
+    out = np.asarray(labels, dtype=object)[np.searchsorted(edges, value, side='right')]
+    out[np.isnan(value)] = default
+    return out
+
+# 可选: numba JIT加速数值内核 (未安装时退回NumPy实现)
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+
+# ==================== 数值内核 ====================
+
+def _soa(df):
+    """DataFrame → ({列名: 连续float64数组}, 共享索引)，列式存储供各指标直接切片"""
+    if df is None or df.empty:
+        return {}, pd.Index([])
+    try:
+        block = df.to_numpy(dtype=np.float64)
+    except (TypeError, ValueError):
+        block = df.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+    return dict(zip(df.columns, np.ascontiguousarray(block.T))), df.index
+
+
+def _trend_last_numpy(x, fast, slow):
+    """尾部 slow 个值 → 趋势标签: 1 上行 / -1 下行 / 0 震荡
+    
+    窗口内数值恒定时均线直接取该值 (与rolling().mean()一致，避免求和舍入误判趋势)
+    """
+    last = x[-1]
+    m_fast = last if (x[-fast:] == last).all() else x[-fast:].mean()
+    m_slow = last if (x[-slow:] == last).all() else x[-slow:].mean()
+    if last > m_fast > m_slow:
+        return 1
+    if last < m_fast < m_slow:
+        return -1
+    return 0
+
+
+def _trend_last_loop(x, fast, slow):
+    """同上，单次遍历同时累加快慢均线 (供numba编译)"""
+    n = len(x)
+    last = x[n - 1]
+    s_fast = 0.0
+    s_slow = 0.0
+    const_fast = True
+    const_slow = True
+    for i in range(n - slow, n):
+        s_slow += x[i]
+        if x[i] != last:
+            const_slow = False
+        if i >= n - fast:
+            s_fast += x[i]
+            if x[i] != last:
+                const_fast = False
+    m_fast = last if const_fast else s_fast / fast
+    m_slow = last if const_slow else s_slow / slow
+    if last > m_fast and m_fast > m_slow:
+        return 1
+    if last < m_fast and m_fast < m_slow:
+        return -1
+    return 0
+
+
+if NUMBA_AVAILABLE:
+    _trend_last = njit(cache=True)(_trend_last_loop)
+else:
+    _trend_last = _trend_last_numpy
+
+_TREND_LABELS = {1: ('上行', '🟢'), -1: ('下行', '🔴'), 0: ('震荡', '🟡')}
+
+
+def _tail_z_all_numpy(tails):
+    """(w, K) 尾部矩阵 → 各列最后一行的Z-Score (ddof=1)；列含NaN或为常数时为NaN"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (tails[-1] - tails.mean(axis=0)) / tails.std(axis=0, ddof=1)
+    z[(tails == tails[0]).all(axis=0)] = np.nan
+    return z
+
+
+def _tail_z_all_loop(tails):
+    """同上，各列独立计算 (供numba按列并行)"""
+    w, k = tails.shape
+    z = np.empty(k)
+    for j in prange(k):
+        first = tails[0, j]
+        s = 0.0
+        const = True
+        for i in range(w):
+            s += tails[i, j]
+            if tails[i, j] != first:
+                const = False
+        if const or np.isnan(s):
+            z[j] = np.nan
+            continue
+        mean = s / w
+        ss = 0.0
+        for i in range(w):
+            d = tails[i, j] - mean
+            ss += d * d
+        z[j] = (tails[w - 1, j] - mean) / np.sqrt(ss / (w - 1))
+    return z
+
+
+if NUMBA_AVAILABLE:
+    _tail_z_all = njit(cache=True, parallel=True)(_tail_z_all_loop)
+else:
+    _tail_z_all = _tail_z_all_numpy
+
+
+def _pct_shift(arr, period):
+    """(arr[t] / arr[t-period] - 1) * 100，前 period 个为NaN，一次写入输出缓冲区"""
+    out = np.empty_like(arr)
+    out[:period] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.multiply(arr[period:] / arr[:-period] - 1.0, 100.0, out=out[period:])
+    return out
+
+
+def _rolling_isconstant(a, window):
+    """每个长度为 window 的滑动窗口是否为常数 (结果长度 n-window+1)
+    
+    用相邻值相等计数的累积和判断，O(N)，无需逐窗口求极差
+    """
+    same = np.concatenate([[0], np.cumsum(a[1:] == a[:-1])])
+    return same[window - 1:] - same[:len(a) - window + 1] == window - 1
+
+
+def _rolling_z_numpy(x, window):
+    """滚动Z-Score (ddof=1)，前 window-1 个及含NaN/常数的窗口为NaN
+    
+    累积和一次求出所有窗口的均值/方差, O(N)
+    """
+    valid = ~np.isnan(x)
+    # 先减去参考值，降低平方累积和的抵消误差
+    ref = x[np.argmax(valid)] if valid.any() else 0.0
+    xc = np.where(valid, x - ref, 0.0)
+    c1 = np.concatenate([[0.0], np.cumsum(xc)])
+    c2 = np.concatenate([[0.0], np.cumsum(xc * xc)])
+    s = c1[window:] - c1[:-window]
+    ss = c2[window:] - c2[:-window]
+    mean = s / window
+    var = (ss - s * mean) / (window - 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (xc[window - 1:] - mean) / np.sqrt(np.maximum(var, 0))
+    # 含NaN的窗口与rolling一致返回NaN
+    nan_cnt = np.concatenate([[0], np.cumsum(~valid)])
+    z[nan_cnt[window:] - nan_cnt[:-window] > 0] = np.nan
+    # 常数窗口std为0，直接置NaN而不是留下浮点残差
+    z[_rolling_isconstant(x, window)] = np.nan
+    return np.concatenate([np.full(window - 1, np.nan), z])
+
+
+def _rolling_z_loop(x, window):
+    """同上，单次遍历维护窗口的和/平方和、NaN数及末尾相等值游程 (供numba编译)"""
+    n = len(x)
+    out = np.full(n, np.nan)
+    ref = 0.0
+    for i in range(n):
+        if not np.isnan(x[i]):
+            ref = x[i]
+            break
+    s = 0.0
+    ss = 0.0
+    nan_cnt = 0
+    run = 0
+    for i in range(n):
+        v = x[i]
+        if np.isnan(v):
+            nan_cnt += 1
+        else:
+            d = v - ref
+            s += d
+            ss += d * d
+        if i > 0 and v == x[i - 1]:
+            run += 1
+        else:
+            run = 1
+        if i >= window:
+            u = x[i - window]
+            if np.isnan(u):
+                nan_cnt -= 1
+            else:
+                d = u - ref
+                s -= d
+                ss -= d * d
+        if i >= window - 1 and nan_cnt == 0 and run < window:
+            mean = s / window
+            var = (ss - s * mean) / (window - 1)
+            if var < 0.0:
+                var = 0.0
+            out[i] = (v - ref - mean) / np.sqrt(var)
+    return out
+
+
+if NUMBA_AVAILABLE:
+    _rolling_z = njit(cache=True)(_rolling_z_loop)
+else:
+    _rolling_z = _rolling_z_numpy
+
+
+def _rolling_corr_numpy(x, y, window):
+    """滚动Pearson相关系数 (结果长度 n-window+1)，输入不含NaN
+    
+    x, y, x², y², xy 的前缀和一次求出所有窗口，O(N)；任一侧窗口为常数时为NaN
+    """
+    # 平移不改变相关系数，先减去首值降低前缀和的抵消误差
+    xc = x - x[0]
+    yc = y - y[0]
+    
+    def wsum(a):
+        c = np.concatenate([[0.0], np.cumsum(a)])
+        return c[window:] - c[:-window]
+    
+    sx, sy = wsum(xc), wsum(yc)
+    cov = window * wsum(xc * yc) - sx * sy
+    var = (window * wsum(xc * xc) - sx * sx) * (window * wsum(yc * yc) - sy * sy)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = cov / np.sqrt(var)
+    r[~(var > 0) | _rolling_isconstant(x, window) | _rolling_isconstant(y, window)] = np.nan
+    return r
+
+
+def _rolling_corr_loop(x, y, window):
+    """同上，单次遍历增减窗口内的五个和，并记录两侧末尾相等值游程 (供numba编译)"""
+    n = len(x)
+    out = np.empty(n - window + 1)
+    x0 = x[0]
+    y0 = y[0]
+    sx = 0.0
+    sy = 0.0
+    sxx = 0.0
+    syy = 0.0
+    sxy = 0.0
+    run_x = 0
+    run_y = 0
+    for i in range(n):
+        a = x[i] - x0
+        b = y[i] - y0
+        sx += a
+        sy += b
+        sxx += a * a
+        syy += b * b
+        sxy += a * b
+        run_x = run_x + 1 if i > 0 and x[i] == x[i - 1] else 1
+        run_y = run_y + 1 if i > 0 and y[i] == y[i - 1] else 1
+        if i >= window:
+            a = x[i - window] - x0
+            b = y[i - window] - y0
+            sx -= a
+            sy -= b
+            sxx -= a * a
+            syy -= b * b
+            sxy -= a * b
+        if i >= window - 1:
+            cov = window * sxy - sx * sy
+            var = (window * sxx - sx * sx) * (window * syy - sy * sy)
+            if run_x >= window or run_y >= window or not var > 0.0:
+                out[i - window + 1] = np.nan
+            else:
+                out[i - window + 1] = cov / np.sqrt(var)
+    return out
+
+
+if NUMBA_AVAILABLE:
+    _rolling_corr = njit(cache=True)(_rolling_corr_loop)
+else:
+    _rolling_corr = _rolling_corr_numpy
+
 
 class IndicatorCalculator:
     """指标计算器"""
@@ -19,68 +359,247 @@ class IndicatorCalculator:
         self.fred = all_data.get('fred', pd.DataFrame())
         self.yahoo = all_data.get('yahoo', pd.DataFrame())
         self.akshare = all_data.get('akshare', pd.DataFrame())
+        # 列式(SoA)只读副本: 列名 -> float64数组，各数据源共享一个索引
+        self.fred_arr, self.fred_idx = _soa(self.fred)
+        self.yahoo_arr, self.yahoo_idx = _soa(self.yahoo)
+        self.akshare_arr, self.akshare_idx = _soa(self.akshare)
+        self._soa_of = {
+            id(self.fred): (self.fred_arr, self.fred_idx),
+            id(self.yahoo): (self.yahoo_arr, self.yahoo_idx),
+            id(self.akshare): (self.akshare_arr, self.akshare_idx),
+        }
+        # (数组字典id, 列名) -> 去NaN后的 (值, 索引)
+        self._arr_cache = {}
+        # (数据源id, 列名) -> 去NaN后的序列
+        self._clean_cache = {}
+        # (FRED列名, 除数) -> 单位换算后的序列
+        self._fred_scaled = {}
+        self._net_liq = None
+        # 全部yahoo列 / SPY 的比率矩阵 (首次使用时构建)
+        self._rs = None
+        
+    def _has(self, source, *cols):
+        """source 是否包含全部 cols，查SoA列字典 (哈希查找，不经过DataFrame.columns)"""
+        arrs = self._soa_of[id(source)][0]
+        return all(c in arrs for c in cols)
+    
+    def _source_of(self, name):
+        """列所在的数据源 (yahoo优先，其次FRED)，都没有时返回None"""
+        for source in (self.yahoo, self.fred):
+            if self._has(source, name):
+                return source
+        return None
+    
+    def _arr(self, arrs, idx, name):
+        """SoA列去NaN后的 (值数组, 索引)，同一列只做一次掩码"""
+        key = (id(arrs), name)
+        hit = self._arr_cache.get(key)
+        if hit is None:
+            values = arrs[name]
+            mask = ~np.isnan(values)
+            hit = self._arr_cache[key] = (values[mask], idx[mask])
+        return hit
+    
+    def _col(self, source, name):
+        """返回 source[name].dropna()，由SoA数组构造，同一数据源同一列只清洗一次"""
+        key = (id(source), name)
+        cached = self._clean_cache.get(key)
+        if cached is None:
+            values, index = self._arr(*self._soa_of[id(source)], name)
+            cached = self._clean_cache[key] = pd.Series(values, index=index, name=name)
+        return cached
+    
+    def _block(self, arrs, cols, mask=None):
+        """由SoA列拼出 (T, K) 矩阵，mask 为可选的行选择 (如SPY有效日)"""
+        if mask is not None:
+            n = int(mask.sum())
+        else:
+            n = len(next(iter(arrs.values()))) if arrs else 0
+        out = np.empty((n, len(cols)))
+        for j, c in enumerate(cols):
+            out[:, j] = arrs[c] if mask is None else arrs[c][mask]
+        return out
+    
+    def _pair(self, source, a, b):
+        """同一数据源两列都有值的交易日 → (a值, b值, 索引)，等价 source[[a, b]].dropna()
         
+        同源列共享索引，直接用SoA的联合掩码，无需对两列的索引求交集
+        """
+        arrs, idx = self._soa_of[id(source)]
+        va, vb = arrs[a], arrs[b]
+        mask = ~(np.isnan(va) | np.isnan(vb))
+        return va[mask], vb[mask], idx[mask]
+    
+    def _rs_matrix(self):
+        """全部yahoo列 / SPY 的比率矩阵 → (矩阵(SPY有效日 × 列), {列名: 列号}, 索引)
+        
+        轮动/RS动量/热力图共用，每个实例只对齐、相除一次
+        """
+        if self._rs is None:
+            spy_v = self.yahoo_arr['SPY']
+            mask = ~np.isnan(spy_v)
+            cols = list(self.yahoo_arr)
+            block = self._block(self.yahoo_arr, cols, mask) / spy_v[mask][:, None]
+            self._rs = (block, {c: j for j, c in enumerate(cols)}, self.yahoo_idx[mask])
+        return self._rs
+    
+    def _rs_ratio(self, ticker):
+        """ticker / SPY 在两者都有值的交易日上的比率 → (值数组, 索引)"""
+        block, pos, idx = self._rs_matrix()
+        ratio = block[:, pos[ticker]]
+        mask = ~np.isnan(ratio)
+        return ratio[mask], idx[mask]
+    
+    def _scaled(self, col, div):
+        """FRED列除以 div 换算单位后的序列 (保留NaN)，同一换算只做一次"""
+        key = (col, div)
+        scaled = self._fred_scaled.get(key)
+        if scaled is None:
+            scaled = self._fred_scaled[key] = self.fred[col] / div
+        return scaled
+    
+    def _net_liquidity(self):
+        """净流动性 = Fed资产负债表 - RRP - TGA (已去NaN)，每个实例只算一次"""
+        if self._net_liq is None:
+            walcl = self._scaled('WALCL', 1000)  # 转换为万亿
+            rrp = self._scaled('RRPONTSYD', 1000)
+            tga = self._scaled('WTREGEN', 1000) * 1e-3  # TGA单位是百万，由十亿口径再换算
+            self._net_liq = (walcl - rrp - tga).dropna()
+        return self._net_liq
+    
     # ==================== 基础计算函数 ====================
     
     def calc_zscore(self, series, window=60):
         """计算Z-Score"""
-        if series is None or len(series) < window:
-            return pd.Series(index=series.index if series is not None else [])
-        rolling_mean = series.rolling(window).mean()
-        rolling_std = series.rolling(window).std()
-        return (series - rolling_mean) / rolling_std
+        if series is None or series.size < window:
+            return pd.Series(dtype='float64')
+        x = np.ascontiguousarray(series.to_numpy(dtype=np.float64))
+        return pd.Series(_rolling_z(x, window), index=series.index, name=series.name)
     
     def calc_percentile(self, series, window=252):
         """计算历史百分位"""
-        if series is None or len(series) < window:
-            return pd.Series(index=series.index if series is not None else [])
-        return series.rolling(window).apply(
-            lambda x: pd.Series(x).rank(pct=True).iloc[-1] * 100, 
-            raw=False
-        )
+        if series is None or series.size < window:
+            return pd.Series(dtype='float64')
+        # 只需每个窗口最后一个值的平均排名: (小于数 + (等于数 + 1) / 2) / window
+        arr = series.to_numpy(dtype=np.float64)
+        win = np.lib.stride_tricks.sliding_window_view(arr, window)
+        last = win[:, -1:]
+        pct = ((win < last).sum(axis=1) + 0.5 * ((win == last).sum(axis=1) + 1)) / window * 100
+        # 窗口内含NaN时与rolling一致返回NaN
+        nan_cnt = np.concatenate([[0], np.cumsum(np.isnan(arr))])
+        pct[nan_cnt[window:] - nan_cnt[:-window] > 0] = np.nan
+        return pd.Series(np.concatenate([np.full(window - 1, np.nan), pct]),
+                         index=series.index, name=series.name)
     
     def calc_trend(self, series, fast=20, slow=50):
         """计算趋势状态"""
-        if series is None or len(series) < slow:
+        if series is None or series.size < slow:
             return None
-            
-        ma_fast = series.rolling(fast).mean()
-        ma_slow = series.rolling(slow).mean()
         
-        latest = series.iloc[-1]
-        ma_fast_latest = ma_fast.iloc[-1]
-        ma_slow_latest = ma_slow.iloc[-1]
-        
-        if latest > ma_fast_latest > ma_slow_latest:
-            return '上行', '🟢'
-        elif latest < ma_fast_latest < ma_slow_latest:
-            return '下行', '🔴'
-        else:
-            return '震荡', '🟡'
+        # 只需最新一根的快慢均线，读尾部 slow 个值即可 (series 可为Series或ndarray)
+        tail = np.ascontiguousarray(np.asarray(series, dtype=np.float64)[-slow:])
+        return _TREND_LABELS[_trend_last(tail, fast, slow)]
     
     def calc_relative_strength(self, asset, benchmark, period=20):
         """计算相对强度"""
         if asset is None or benchmark is None:
             return None
         
-        # 对齐索引
-        common_idx = asset.index.intersection(benchmark.index)
-        if len(common_idx) < period:
+        # 对齐索引 (一次内连接，代替求交集后再分别 .loc)
+        asset, benchmark = asset.align(benchmark, join='inner')
+        if asset.size < period:
             return None
-            
-        asset = asset.loc[common_idx]
-        benchmark = benchmark.loc[common_idx]
         
-        # 相对强度 = 资产/基准 的变化率
-        ratio = asset / benchmark
-        rs = ratio.pct_change(period) * 100  # 百分比
-        return rs
+        # 相对强度 = 资产/基准 的变化率 (百分比)
+        ratio = asset.to_numpy(dtype=np.float64) / benchmark.to_numpy(dtype=np.float64)
+        return pd.Series(_pct_shift(ratio, period), index=asset.index)
     
     def calc_momentum(self, series, period=20):
         """计算动量"""
-        if series is None or len(series) < period:
+        if series is None or series.size < period:
+            return None
+        return pd.Series(_pct_shift(series.to_numpy(dtype=np.float64), period),
+                         index=series.index, name=series.name)
+    
+    def _tails(self, arrs, idx, cols, n):
+        """SoA中各列去NaN后的最后 n 个值 → {列名: ndarray}，缺失列不返回"""
+        return {c: self._arr(arrs, idx, c)[0][-n:] for c in cols if c in arrs}
+    
+    def _tails_z(self, tails, window=60):
+        """_tails 结果中各列最新值的 window 日Z-Score → {列名: z}，所有列一次 _tail_z_all 批量计算
+        
+        与逐列 _z_last 一致: 数据不足(<= window)、含NaN或常数窗口为NaN
+        """
+        z = {c: np.nan for c in tails}
+        cols = [c for c, v in tails.items() if len(v) > window]
+        if cols:
+            z.update(zip(cols, _tail_z_all(np.column_stack([tails[c][-window:] for c in cols]))))
+        return z
+    
+    def _momentum_last(self, values, period=20):
+        """最新值的 period 日变化率(%)，等价 calc_momentum(...).iloc[-1]，数据不足返回NaN"""
+        if len(values) <= period:
+            return np.nan
+        return (values[-1] / values[-1 - period] - 1) * 100
+    
+    def _z_last(self, values, window=60):
+        """最新值在尾部 window 个值中的Z-Score，等价 calc_zscore(...).iloc[-1] if len > window else NaN
+        
+        values 可为ndarray或Series；数据不足(<= window)、窗口含NaN或为常数时返回NaN
+        """
+        if len(values) <= window:
+            return np.nan
+        tail = np.asarray(values, dtype=np.float64)[-window:]
+        if (tail == tail[0]).all():
+            return np.nan
+        return (tail[-1] - tail.mean()) / tail.std(ddof=1)
+    
+    def _pct_last(self, values, window=252):
+        """最新值在尾部 window 个值中的百分位，等价 calc_percentile(...).iloc[-1] if len > window else NaN
+        
+        只排最后一个窗口，O(window)；数据不足(<= window)或窗口含NaN时返回NaN
+        """
+        if len(values) <= window:
+            return np.nan
+        tail = np.asarray(values, dtype=np.float64)[-window:]
+        if np.isnan(tail).any():
+            return np.nan
+        last = tail[-1]
+        return ((tail < last).sum() + 0.5 * ((tail == last).sum() + 1)) / window * 100
+    
+    def _tail_matrix(self, block, n):
+        """(T, K) 矩阵各列去NaN后的最后 n 个值 → ((n, K) 矩阵, 各列有效数)，不足 n 个的列顶部补NaN"""
+        k = block.shape[1]
+        out = np.full((n, k), np.nan)
+        counts = np.empty(k, dtype=np.int64)
+        for j in range(k):
+            col = block[:, j]
+            col = col[~np.isnan(col)]
+            counts[j] = len(col)
+            tail = col[-n:]
+            out[n - len(tail):, j] = tail
+        return out, counts
+    
+    def _rs_z_all(self, block, period=RS_PERIOD, window=60):
+        """(T, K) 已对齐比率矩阵 → (各列最新RS(%), 各列RS的window日Z-Score)，数据不足的列Z为NaN"""
+        tails, _ = self._tail_matrix(block, period + window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = (tails[period:] / tails[:-period] - 1) * 100
+        return rs[-1], _tail_z_all(np.ascontiguousarray(rs))
+    
+    def _rs_z_last(self, ratio, period=RS_PERIOD, window=60):
+        """由已对齐的比率数组求最新RS(%)及其window日Z-Score，只读尾部 period+window 个值
+        
+        与 calc_relative_strength + calc_zscore 取 iloc[-1] 等价，Z-Score无效时返回None
+        """
+        if len(ratio) < period + window:
+            return None
+        tail = ratio[-(period + window):]
+        rs = (tail[period:] / tail[:-period] - 1) * 100
+        z = _tail_z_all(rs[:, None])[0]
+        if np.isnan(z):
             return None
-        return series.pct_change(period) * 100
+        return rs[-1], z
     
     # ==================== 流动性指标 ====================
     
@@ -89,66 +608,61 @@ class IndicatorCalculator:
         results = {}
         
         # 净流动性 = Fed资产负债表 - RRP - TGA
-        if all(col in self.fred.columns for col in ['WALCL', 'RRPONTSYD', 'WTREGEN']):
-            walcl = self.fred['WALCL'] / 1000  # 转换为万亿
-            rrp = self.fred['RRPONTSYD'] / 1000
-            tga = self.fred['WTREGEN'] / 1000000  # TGA单位是百万
-            
-            net_liq = walcl - rrp - tga
-            net_liq = net_liq.dropna()
+        if self._has(self.fred, 'WALCL', 'RRPONTSYD', 'WTREGEN'):
+            net_liq = self._net_liquidity()
             
             if len(net_liq) > 0:
                 results['net_liquidity'] = {
                     'series': net_liq,
                     'latest': net_liq.iloc[-1],
-                    'z_60d': self.calc_zscore(net_liq, 60).iloc[-1] if len(net_liq) > 60 else np.nan,
-                    'z_252d': self.calc_zscore(net_liq, 252).iloc[-1] if len(net_liq) > 252 else np.nan,
-                    'pct_252d': self.calc_percentile(net_liq, 252).iloc[-1] if len(net_liq) > 252 else np.nan,
-                    'change_20d': self.calc_momentum(net_liq, 20).iloc[-1] if len(net_liq) > 20 else np.nan,
+                    'z_60d': self._z_last(net_liq, 60),
+                    'z_252d': self._z_last(net_liq, 252),
+                    'pct_252d': self._pct_last(net_liq, 252),
+                    'change_20d': self._momentum_last(net_liq.to_numpy(), 20),
                 }
         
         # RRP
-        if 'RRPONTSYD' in self.fred.columns:
-            rrp = self.fred['RRPONTSYD']
-            rrp = rrp.dropna()
+        if self._has(self.fred, 'RRPONTSYD'):
+            rrp = self._col(self.fred, 'RRPONTSYD')
             if len(rrp) > 1:
                 results['rrp'] = {
                     'latest': rrp.iloc[-1],
                     'change_1d': rrp.iloc[-1] - rrp.iloc[-2] if len(rrp) > 1 else 0,
-                    'z_60d': self.calc_zscore(rrp, 60).iloc[-1] if len(rrp) > 60 else np.nan,
+                    'z_60d': self._z_last(rrp, 60),
                 }
         
         # TGA
-        if 'WTREGEN' in self.fred.columns:
-            tga = self.fred['WTREGEN'] / 1000  # 转换为十亿
-            tga = tga.dropna()
+        if self._has(self.fred, 'WTREGEN'):
+            tga = self._scaled('WTREGEN', 1000).dropna()  # 转换为十亿
             if len(tga) > 1:
                 results['tga'] = {
                     'latest': tga.iloc[-1],
                     'change_1d': tga.iloc[-1] - tga.iloc[-2] if len(tga) > 1 else 0,
-                    'z_60d': self.calc_zscore(tga, 60).iloc[-1] if len(tga) > 60 else np.nan,
+                    'z_60d': self._z_last(tga, 60),
                 }
         
         # SOFR (利率数据可能不在FRED中)
-        if 'SOFR' in self.fred.columns:
-            sofr = self.fred['SOFR'].dropna()
+        if self._has(self.fred, 'SOFR'):
+            sofr = self._col(self.fred, 'SOFR')
             if len(sofr) > 0:
                 results['sofr'] = {
                     'latest': sofr.iloc[-1],
+                    # 政策利率常长期持平，常数窗口由 _z_last 直接返回NaN
+                    'z_60d': self._z_last(sofr, 60),
                 }
         
         # HYG/LQD 信用风险偏好
-        if all(col in self.yahoo.columns for col in ['HYG', 'LQD']):
-            hyg = self.yahoo['HYG']
-            lqd = self.yahoo['LQD']
-            hyg_lqd = (hyg / lqd).dropna()
+        if self._has(self.yahoo, 'HYG', 'LQD'):
+            hyg, lqd, common_idx = self._pair(self.yahoo, 'HYG', 'LQD')
+            ratio = hyg / lqd
+            hyg_lqd = pd.Series(ratio, index=common_idx)
             
             if len(hyg_lqd) > 0:
                 results['hyg_lqd'] = {
                     'series': hyg_lqd,
                     'latest': hyg_lqd.iloc[-1],
-                    'z_60d': self.calc_zscore(hyg_lqd, 60).iloc[-1] if len(hyg_lqd) > 60 else np.nan,
-                    'change_1d': hyg_lqd.pct_change().iloc[-1] * 100 if len(hyg_lqd) > 1 else np.nan,
+                    'z_60d': self._z_last(hyg_lqd, 60),
+                    'change_1d': self._momentum_last(ratio, 1),
                 }
         
         return results
@@ -159,90 +673,79 @@ class IndicatorCalculator:
         """计算货币和利率指标"""
         results = {}
         
+        # 标量指标(最新值/Z/动量/趋势)只需各列去NaN后的最近61个点，按数据源整块取一次
+        y_tail = self._tails(self.yahoo_arr, self.yahoo_idx, ['DX-Y.NYB', 'JPY=X', '^VIX'], 61)
+        f_tail = self._tails(self.fred_arr, self.fred_idx, ['DGS10', 'DGS3MO', 'DGS2', 'DFF'], 61)
+        y_z = self._tails_z(y_tail, 60)
+        f_z = self._tails_z(f_tail, 60)
+        
         # DXY
         dxy_col = 'DX-Y.NYB'
-        if dxy_col in self.yahoo.columns:
-            dxy = self.yahoo[dxy_col].dropna()
-            if len(dxy) > 0:
-                trend_state, trend_emoji = self.calc_trend(dxy) or ('N/A', '⚪')
-                results['dxy'] = {
-                    'series': dxy,
-                    'latest': dxy.iloc[-1],
-                    'trend': trend_state,
-                    'trend_emoji': trend_emoji,
-                    'z_60d': self.calc_zscore(dxy, 60).iloc[-1] if len(dxy) > 60 else np.nan,
-                    'change_20d': self.calc_momentum(dxy, 20).iloc[-1] if len(dxy) > 20 else np.nan,
-                }
+        v = y_tail.get(dxy_col)
+        if v is not None and len(v) > 0:
+            trend_state, trend_emoji = self.calc_trend(v) or ('N/A', '⚪')
+            results['dxy'] = {
+                'series': self._col(self.yahoo, dxy_col),
+                'latest': v[-1],
+                'trend': trend_state,
+                'trend_emoji': trend_emoji,
+                'z_60d': y_z[dxy_col],
+                'change_20d': self._momentum_last(v, 20),
+            }
         
         # USDJPY
         usdjpy_col = 'JPY=X'
-        if usdjpy_col in self.yahoo.columns:
-            usdjpy = self.yahoo[usdjpy_col].dropna()
-            if len(usdjpy) > 0:
-                trend_state, trend_emoji = self.calc_trend(usdjpy) or ('N/A', '⚪')
-                momentum = self.calc_momentum(usdjpy, 20)
-                
-                # Carry Trade风险评估
-                # USDJPY下降（日元走强）= Carry平仓风险上升
-                carry_risk = '低'
-                if momentum is not None and len(momentum) > 0:
-                    mom_val = momentum.iloc[-1]
-                    if mom_val < -3:
-                        carry_risk = '高'
-                    elif mom_val < -1:
-                        carry_risk = '中'
-                
-                results['usdjpy'] = {
-                    'series': usdjpy,
-                    'latest': usdjpy.iloc[-1],
-                    'trend': trend_state,
-                    'trend_emoji': trend_emoji,
-                    'z_60d': self.calc_zscore(usdjpy, 60).iloc[-1] if len(usdjpy) > 60 else np.nan,
-                    'change_20d': momentum.iloc[-1] if momentum is not None and len(momentum) > 0 else np.nan,
-                    'carry_risk': carry_risk,
-                }
+        v = y_tail.get(usdjpy_col)
+        if v is not None and len(v) > 0:
+            trend_state, trend_emoji = self.calc_trend(v) or ('N/A', '⚪')
+            mom_val = self._momentum_last(v, 20)
+            
+            # Carry Trade风险评估
+            # USDJPY下降（日元走强）= Carry平仓风险上升
+            carry_risk = _bucket_label(_CARRY_EDGES, _CARRY_LABELS, mom_val, '低')
+            
+            results['usdjpy'] = {
+                'series': self._col(self.yahoo, usdjpy_col),
+                'latest': v[-1],
+                'trend': trend_state,
+                'trend_emoji': trend_emoji,
+                'z_60d': y_z[usdjpy_col],
+                'change_20d': mom_val,
+                'carry_risk': carry_risk,
+            }
         
         # 10Y收益率
-        if 'DGS10' in self.fred.columns:
-            dgs10 = self.fred['DGS10'].dropna()
-            if len(dgs10) > 0:
-                results['dgs10'] = {
-                    'latest': dgs10.iloc[-1],
-                    'z_60d': self.calc_zscore(dgs10, 60).iloc[-1] if len(dgs10) > 60 else np.nan,
-                }
+        v = f_tail.get('DGS10')
+        if v is not None and len(v) > 0:
+            results['dgs10'] = {
+                'latest': v[-1],
+                'z_60d': f_z['DGS10'],
+            }
         
         # 3M收益率
-        if 'DGS3MO' in self.fred.columns:
-            dgs3mo = self.fred['DGS3MO'].dropna()
-            if len(dgs3mo) > 0:
-                results['dgs3mo'] = {
-                    'latest': dgs3mo.iloc[-1],
-                }
+        v = f_tail.get('DGS3MO')
+        if v is not None and len(v) > 0:
+            results['dgs3mo'] = {
+                'latest': v[-1],
+            }
         
         # 期限利差 10Y-3M
-        if 'DGS10' in self.fred.columns and 'DGS3MO' in self.fred.columns:
+        if self._has(self.fred, 'DGS10', 'DGS3MO'):
             spread = (self.fred['DGS10'] - self.fred['DGS3MO']).dropna()
             if len(spread) > 0:
                 # 曲线形态判断
                 latest_spread = spread.iloc[-1]
-                if latest_spread < -0.5:
-                    curve_shape = '深度倒挂'
-                elif latest_spread < 0:
-                    curve_shape = '倒挂'
-                elif latest_spread < 0.5:
-                    curve_shape = '平坦'
-                else:
-                    curve_shape = '陡峭'
+                curve_shape = _bucket_label(_CURVE_EDGES, _CURVE_LABELS, latest_spread, '陡峭')
                     
                 results['term_spread'] = {
                     'series': spread,
                     'latest': latest_spread,
                     'curve_shape': curve_shape,
-                    'z_60d': self.calc_zscore(spread, 60).iloc[-1] if len(spread) > 60 else np.nan,
+                    'z_60d': self._z_last(spread, 60),
                 }
         
         # 实际利率 = 10Y - 10Y BEI
-        if 'DGS10' in self.fred.columns and 'T10YIE' in self.fred.columns:
+        if self._has(self.fred, 'DGS10', 'T10YIE'):
             real_rate = (self.fred['DGS10'] - self.fred['T10YIE']).dropna()
             if len(real_rate) > 0:
                 trend_state, trend_emoji = self.calc_trend(real_rate) or ('N/A', '⚪')
@@ -251,73 +754,57 @@ class IndicatorCalculator:
                     'latest': real_rate.iloc[-1],
                     'trend': trend_state,
                     'trend_emoji': trend_emoji,
-                    'z_60d': self.calc_zscore(real_rate, 60).iloc[-1] if len(real_rate) > 60 else np.nan,
+                    'z_60d': self._z_last(real_rate, 60),
                 }
         
         # VIX
-        if '^VIX' in self.yahoo.columns:
-            vix = self.yahoo['^VIX'].dropna()
-            if len(vix) > 0:
-                results['vix'] = {
-                    'latest': vix.iloc[-1],
-                    'z_60d': self.calc_zscore(vix, 60).iloc[-1] if len(vix) > 60 else np.nan,
-                }
+        v = y_tail.get('^VIX')
+        if v is not None and len(v) > 0:
+            results['vix'] = {
+                'latest': v[-1],
+                'z_60d': y_z['^VIX'],
+            }
         
         # MOVE债市波动指数
-        if '^MOVE' in self.yahoo.columns:
-            move = self.yahoo['^MOVE'].dropna()
+        if self._has(self.yahoo, '^MOVE'):
+            move = self._col(self.yahoo, '^MOVE')
             if len(move) > 0:
                 results['move'] = {
                     'latest': move.iloc[-1],
-                    'z_60d': self.calc_zscore(move, 60).iloc[-1] if len(move) > 60 else np.nan,
-                    'pct_252d': self.calc_percentile(move, 252).iloc[-1] if len(move) > 252 else np.nan,
+                    'z_60d': self._z_last(move, 60),
+                    'pct_252d': self._pct_last(move, 252),
                 }
         
         # ==================== 央行政策代理指标 ====================
         
         # 获取当前Fed利率 (优先使用FRED DFF数据)
         current_fed_rate = CURRENT_FED_RATE  # 默认值
-        if 'DFF' in self.fred.columns:
-            dff = self.fred['DFF'].dropna()
-            if len(dff) > 0:
-                current_fed_rate = dff.iloc[-1]
-                print(f"✓ 使用FRED实时Fed利率: {current_fed_rate:.2f}%")
+        v = f_tail.get('DFF')
+        if v is not None and len(v) > 0:
+            current_fed_rate = v[-1]
+            print(f"✓ 使用FRED实时Fed利率: {current_fed_rate:.2f}%")
         
         # Fed政策预期: 2Y国债 vs 当前Fed利率
-        if 'DGS2' in self.fred.columns:
-            dgs2 = self.fred['DGS2'].dropna()
-            if len(dgs2) > 0:
-                fed_policy_signal = dgs2.iloc[-1] - current_fed_rate
-                # 负值越大 = 市场定价越多降息
-                if fed_policy_signal < -0.75:
-                    fed_outlook = '鸽派 (市场预期多次降息)'
-                elif fed_policy_signal < -0.25:
-                    fed_outlook = '偏鸽 (市场预期降息)'
-                elif fed_policy_signal > 0.25:
-                    fed_outlook = '偏鹰 (市场预期加息)'
-                else:
-                    fed_outlook = '中性'
-                    
-                results['fed_policy'] = {
-                    'dgs2': dgs2.iloc[-1],
-                    'signal': fed_policy_signal,
-                    'outlook': fed_outlook,
-                    'current_rate': current_fed_rate,
-                }
+        v = f_tail.get('DGS2')
+        if v is not None and len(v) > 0:
+            dgs2_latest = v[-1]
+            fed_policy_signal = dgs2_latest - current_fed_rate
+            # 负值越大 = 市场定价越多降息
+            fed_outlook = _bucket_label(_FED_EDGES, _FED_LABELS, fed_policy_signal, '中性')
+            
+            results['fed_policy'] = {
+                'dgs2': dgs2_latest,
+                'signal': fed_policy_signal,
+                'outlook': fed_outlook,
+                'current_rate': current_fed_rate,
+            }
         
         # BOJ政策预期: 用USDJPY动量作为代理
         if 'usdjpy' in results:
             usdjpy_mom = results['usdjpy'].get('change_20d', 0)
-            if usdjpy_mom is not None and not np.isnan(usdjpy_mom):
-                # 日元走强（USDJPY下降）= 市场预期BOJ更鹰/Fed更鸽
-                if usdjpy_mom < -3:
-                    boj_outlook = '鹰派信号 (日元走强)'
-                elif usdjpy_mom < -1:
-                    boj_outlook = '偏鹰 (日元小幅走强)'
-                elif usdjpy_mom > 3:
-                    boj_outlook = '鸽派信号 (日元走弱)'
-                else:
-                    boj_outlook = '中性'
+            # 日元走强（USDJPY下降）= 市场预期BOJ更鹰/Fed更鸽
+            if usdjpy_mom is not None:
+                boj_outlook = _bucket_label(_BOJ_EDGES, _BOJ_LABELS, usdjpy_mom, 'N/A')
             else:
                 boj_outlook = 'N/A'
                 
@@ -339,10 +826,10 @@ class IndicatorCalculator:
         }
         
         # 基准: SPY
-        if 'SPY' not in self.yahoo.columns:
+        if not self._has(self.yahoo, 'SPY'):
             return results
             
-        spy = self.yahoo['SPY'].dropna()
+        spy = self._col(self.yahoo, 'SPY')
         
         # 计算各资产对SPY的相对强度
         assets = {
@@ -357,57 +844,54 @@ class IndicatorCalculator:
             'IWM': '小盘股',
         }
         
-        for ticker, name in assets.items():
-            if ticker in self.yahoo.columns:
-                asset = self.yahoo[ticker].dropna()
-                rs = self.calc_relative_strength(asset, spy, RS_PERIOD)
-                
-                if rs is not None and len(rs) > 0:
-                    rs_z = self.calc_zscore(rs, 60)
-                    if len(rs_z) > 0 and not np.isnan(rs_z.iloc[-1]):
-                        z_val = rs_z.iloc[-1]
-                        emoji, signal = get_zscore_signal(z_val)
-                        
-                        results['rankings'].append({
-                            'ticker': ticker,
-                            'name': name,
-                            'rs': rs.iloc[-1],
-                            'z': z_val,
-                            'emoji': emoji,
-                            'signal': signal,
-                        })
+        # 从共用的RS比率矩阵中取出各资产列
+        rs_block, rs_pos, _ = self._rs_matrix()
+        cols = [t for t in assets if self._has(self.yahoo, t)]
+        rs_last, rs_z = self._rs_z_all(rs_block[:, [rs_pos[t] for t in cols]])
+        
+        for ticker, rs_val, z_val in zip(cols, rs_last, rs_z):
+            if np.isnan(z_val):
+                continue
+            emoji, signal = get_zscore_signal(z_val)
+            
+            results['rankings'].append({
+                'ticker': ticker,
+                'name': assets[ticker],
+                'rs': rs_val,
+                'z': z_val,
+                'emoji': emoji,
+                'signal': signal,
+            })
         
         # 添加A股/港股指数
         if not self.akshare.empty:
             for col in self.akshare.columns:
                 if col in ['sh000300', 'HSI']:
                     name = '沪深300' if col == 'sh000300' else '恒生指数'
-                    asset = self.akshare[col].dropna()
+                    asset = self._col(self.akshare, col)
                     
-                    # 对齐到SPY的交易日
-                    common_idx = asset.index.intersection(spy.index)
-                    if len(common_idx) > RS_PERIOD:
-                        asset_aligned = asset.loc[common_idx]
-                        spy_aligned = spy.loc[common_idx]
-                        rs = self.calc_relative_strength(asset_aligned, spy_aligned, RS_PERIOD)
-                        
-                        if rs is not None and len(rs) > 0:
-                            rs_z = self.calc_zscore(rs, 60)
-                            if len(rs_z) > 0 and not np.isnan(rs_z.iloc[-1]):
-                                z_val = rs_z.iloc[-1]
-                                emoji, signal = get_zscore_signal(z_val)
-                                
-                                results['rankings'].append({
-                                    'ticker': col,
-                                    'name': name,
-                                    'rs': rs.iloc[-1],
-                                    'z': z_val,
-                                    'emoji': emoji,
-                                    'signal': signal,
-                                })
-        
-        # 按Z-Score排序
-        results['rankings'] = sorted(results['rankings'], key=lambda x: x['z'], reverse=True)
+                    # 对齐到SPY的交易日 (跨数据源，内连接一次)
+                    asset, spy_aligned = asset.align(spy, join='inner')
+                    if len(asset) > RS_PERIOD:
+                        ratio = asset.to_numpy(dtype=np.float64) / spy_aligned.to_numpy(dtype=np.float64)
+                        last = self._rs_z_last(ratio)
+                        if last is not None:
+                            rs_val, z_val = last
+                            emoji, signal = get_zscore_signal(z_val)
+                            
+                            results['rankings'].append({
+                                'ticker': col,
+                                'name': name,
+                                'rs': rs_val,
+                                'z': z_val,
+                                'emoji': emoji,
+                                'signal': signal,
+                            })
+        
+        # 按Z-Score降序 (稳定排序，同分保持原顺序)
+        rankings = results['rankings']
+        order = np.argsort(-np.array([r['z'] for r in rankings], dtype=np.float64), kind='stable')
+        results['rankings'] = [rankings[i] for i in order]
         
         # 极端情绪指标
         extreme_tickers = {
@@ -415,33 +899,30 @@ class IndicatorCalculator:
             'ARKK': 'ARK创新',
         }
         
-        for ticker, name in extreme_tickers.items():
-            if ticker in self.yahoo.columns:
-                asset = self.yahoo[ticker].dropna()
-                rs = self.calc_relative_strength(asset, spy, RS_PERIOD)
-                
-                if rs is not None and len(rs) > 0:
-                    rs_z = self.calc_zscore(rs, 60)
-                    if len(rs_z) > 0 and not np.isnan(rs_z.iloc[-1]):
-                        z_val = rs_z.iloc[-1]
-                        
-                        # 情绪解读
-                        if z_val > 1.5:
-                            sentiment = '投机狂热'
-                        elif z_val > 0.5:
-                            sentiment = '风险偏好上升'
-                        elif z_val < -1.5:
-                            sentiment = '投机冰点'
-                        elif z_val < -0.5:
-                            sentiment = '风险偏好下降'
-                        else:
-                            sentiment = '中性'
-                        
-                        results['extreme_sentiment'][ticker] = {
-                            'name': name,
-                            'z': z_val,
-                            'sentiment': sentiment,
-                        }
+        cols = [t for t in extreme_tickers if self._has(self.yahoo, t)]
+        _, rs_z = self._rs_z_all(rs_block[:, [rs_pos[t] for t in cols]])
+        
+        for ticker, z_val in zip(cols, rs_z):
+            if np.isnan(z_val):
+                continue
+            
+            # 情绪解读
+            if z_val > 1.5:
+                sentiment = '投机狂热'
+            elif z_val > 0.5:
+                sentiment = '风险偏好上升'
+            elif z_val < -1.5:
+                sentiment = '投机冰点'
+            elif z_val < -0.5:
+                sentiment = '风险偏好下降'
+            else:
+                sentiment = '中性'
+            
+            results['extreme_sentiment'][ticker] = {
+                'name': extreme_tickers[ticker],
+                'z': z_val,
+                'sentiment': sentiment,
+            }
         
         return results
     
@@ -455,29 +936,31 @@ class IndicatorCalculator:
             'breadth': [],
         }
         
-        for category, pairs in SECTOR_PAIRS.items():
-            for pair_key, (ticker1, ticker2, name) in pairs.items():
-                if ticker1 in self.yahoo.columns and ticker2 in self.yahoo.columns:
-                    asset1 = self.yahoo[ticker1].dropna()
-                    asset2 = self.yahoo[ticker2].dropna()
-                    
-                    # 计算比率
-                    common_idx = asset1.index.intersection(asset2.index)
-                    if len(common_idx) > 60:
-                        ratio = asset1.loc[common_idx] / asset2.loc[common_idx]
-                        ratio_z = self.calc_zscore(ratio, 60)
-                        
-                        if len(ratio_z) > 0 and not np.isnan(ratio_z.iloc[-1]):
-                            z_val = ratio_z.iloc[-1]
-                            emoji, signal = get_zscore_signal(z_val)
-                            
-                            results[category].append({
-                                'pair': pair_key,
-                                'name': name,
-                                'z': z_val,
-                                'emoji': emoji,
-                                'signal': signal,
-                            })
+        pairs = [p for p in SECTOR_PAIR_LIST if self._has(self.yahoo, p[2], p[3])]
+        if not pairs:
+            return results
+        
+        # 分子/分母各取一个整块，一次求出所有板块对的比率
+        numer = self._block(self.yahoo_arr, [p[2] for p in pairs])
+        denom = self._block(self.yahoo_arr, [p[3] for p in pairs])
+        ratios = numer / denom
+        
+        # 各列取两边都有数据的最近60个交易日，一次求出所有Z-Score
+        tails, counts = self._tail_matrix(ratios, 60)
+        z_all = _tail_z_all(tails)
+        
+        for (category, pair_key, _, _, name), n_valid, z_val in zip(pairs, counts, z_all):
+            if n_valid <= 60 or np.isnan(z_val):
+                continue
+            emoji, signal = get_zscore_signal(z_val)
+            
+            results[category].append({
+                'pair': pair_key,
+                'name': name,
+                'z': z_val,
+                'emoji': emoji,
+                'signal': signal,
+            })
         
         return results
     
@@ -487,10 +970,8 @@ class IndicatorCalculator:
         """计算相对强度的变化率，判断资金流动加速/减速"""
         results = []
         
-        if 'SPY' not in self.yahoo.columns:
+        if not self._has(self.yahoo, 'SPY'):
             return results
-            
-        spy = self.yahoo['SPY'].dropna()
         
         # 所有要计算的资产
         assets = {
@@ -509,49 +990,37 @@ class IndicatorCalculator:
             'TLT': '长期国债',
         }
         
+        rows = []
         for ticker, name in assets.items():
-            if ticker not in self.yahoo.columns:
+            if not self._has(self.yahoo, ticker):
                 continue
                 
-            asset = self.yahoo[ticker].dropna()
-            common_idx = asset.index.intersection(spy.index)
+            # RS序列；只用到当前和5日前两个点的60日Z-Score，各读一个尾部窗口即可
+            rs, _ = self._rs_ratio(ticker)
             
-            if len(common_idx) < 70:  # 需要足够数据计算60日Z和5日变化
+            if len(rs) < 70:  # 需要足够数据计算60日Z和5日变化
                 continue
-                
-            asset = asset.loc[common_idx]
-            spy_aligned = spy.loc[common_idx]
             
-            # 计算RS和RS的Z-Score时间序列
-            rs = asset / spy_aligned
-            rs_z = self.calc_zscore(rs, 60)
-            
-            if len(rs_z) < 6:
-                continue
-                
             # 当前RS Z-Score
-            current_z = rs_z.iloc[-1]
+            current_z = self._z_last(rs, 60)
             if np.isnan(current_z):
                 continue
             
             # RS Z-Score的5日变化（动量）
-            z_5d_ago = rs_z.iloc[-6] if len(rs_z) >= 6 else rs_z.iloc[0]
+            z_5d_ago = self._z_last(rs[:-5], 60)
             rs_momentum = current_z - z_5d_ago if not np.isnan(z_5d_ago) else 0
-            
-            # 四象限判断
-            if current_z > 0 and rs_momentum > 0:
-                status = '加速上涨'
-                status_emoji = '🚀'
-            elif current_z > 0 and rs_momentum <= 0:
-                status = '上涨减速'
-                status_emoji = '⚠️'
-            elif current_z <= 0 and rs_momentum > 0:
-                status = '下跌减速'
-                status_emoji = '🔄'
-            else:
-                status = '加速下跌'
-                status_emoji = '📉'
-            
+            rows.append((ticker, name, current_z, rs_momentum))
+        
+        if not rows:
+            return results
+        
+        # 四象限判断: 所有资产一次 np.select
+        z = np.array([r[2] for r in rows], dtype=np.float64)
+        mom = np.array([r[3] for r in rows], dtype=np.float64)
+        quadrant = np.select([(z > 0) & (mom > 0), (z > 0) & (mom <= 0), (z <= 0) & (mom > 0)], [0, 1, 2], default=3)
+        
+        for (ticker, name, current_z, rs_momentum), q in zip(rows, quadrant):
+            status, status_emoji = _RS_QUADRANTS[q]
             results.append({
                 'ticker': ticker,
                 'name': name,
@@ -575,10 +1044,10 @@ class IndicatorCalculator:
             'data': [],  # 二维数组 [asset][week]
         }
         
-        if 'SPY' not in self.yahoo.columns:
+        if not self._has(self.yahoo, 'SPY'):
             return results
             
-        spy = self.yahoo['SPY'].dropna()
+        spy = self._col(self.yahoo, 'SPY')
         
         # 资产列表
         assets = {
@@ -592,43 +1061,30 @@ class IndicatorCalculator:
             'DBC': '商品',
         }
         
-        # 获取周度采样点（每周最后一个交易日）
-        weekly_dates = []
+        # 获取周度采样点（每周最后一个交易日）: 索引有序，二分查找各目标日当天或之前最近的交易日
         current_date = spy.index[-1]
-        for i in range(weeks):
-            target_date = current_date - timedelta(days=7*i)
-            # 找最近的交易日
-            valid_dates = spy.index[spy.index <= target_date]
-            if len(valid_dates) > 0:
-                weekly_dates.append(valid_dates[-1])
-        
-        weekly_dates = sorted(weekly_dates)
+        targets = pd.DatetimeIndex([current_date - timedelta(days=7*i) for i in range(weeks)])
+        pos = spy.index.searchsorted(targets, side='right') - 1
+        weekly_dates = spy.index[np.sort(pos[pos >= 0])]
         results['dates'] = [d.strftime('%m/%d') for d in weekly_dates]
         
         # 计算每个资产在每个时间点的RS Z-Score
         for ticker, name in assets.items():
-            if ticker not in self.yahoo.columns:
+            if not self._has(self.yahoo, ticker):
                 continue
                 
-            asset = self.yahoo[ticker].dropna()
-            common_idx = asset.index.intersection(spy.index)
+            rs, common_idx = self._rs_ratio(ticker)
             
             if len(common_idx) < 60:
                 continue
-                
-            asset = asset.loc[common_idx]
-            spy_aligned = spy.loc[common_idx]
             
-            rs = asset / spy_aligned
-            rs_z = self.calc_zscore(rs, 60)
+            rs_z = _rolling_z(rs, 60)
             
-            # 获取每周的Z-Score
+            # 获取每周的Z-Score: 该日期或之前最近的数据，一次二分查找全部采样点
             weekly_z = []
-            for date in weekly_dates:
-                # 找到该日期或之前最近的数据
-                valid = rs_z[rs_z.index <= date]
-                if len(valid) > 0 and not np.isnan(valid.iloc[-1]):
-                    weekly_z.append(round(valid.iloc[-1], 2))
+            for i in common_idx.searchsorted(weekly_dates, side='right') - 1:
+                if i >= 0 and not np.isnan(rs_z[i]):
+                    weekly_z.append(round(rs_z[i], 2))
                 else:
                     weekly_z.append(0)
             
@@ -644,15 +1100,13 @@ class IndicatorCalculator:
         results = []
         
         # 1. 铜/金比率 - 全球经济风向标
-        if 'CPER' in self.yahoo.columns and 'GLD' in self.yahoo.columns:
-            copper = self.yahoo['CPER'].dropna()
-            gold = self.yahoo['GLD'].dropna()
-            common_idx = copper.index.intersection(gold.index)
+        if self._has(self.yahoo, 'CPER', 'GLD'):
+            copper, gold, common_idx = self._pair(self.yahoo, 'CPER', 'GLD')
             
             if len(common_idx) > 20:
-                ratio = copper.loc[common_idx] / gold.loc[common_idx]
-                current = ratio.iloc[-1]
-                change_20d = (ratio.iloc[-1] / ratio.iloc[-21] - 1) * 100 if len(ratio) > 21 else 0
+                ratio = copper / gold
+                current = ratio[-1]
+                change_20d = (ratio[-1] / ratio[-21] - 1) * 100 if len(ratio) > 21 else 0
                 
                 if change_20d > 3:
                     signal = '🟢 Risk-on加强'
@@ -670,16 +1124,14 @@ class IndicatorCalculator:
                 })
         
         # 2. 高收益债利差 (HYG vs TLT)
-        if 'HYG' in self.yahoo.columns and 'TLT' in self.yahoo.columns:
-            hyg = self.yahoo['HYG'].dropna()
-            tlt = self.yahoo['TLT'].dropna()
-            common_idx = hyg.index.intersection(tlt.index)
+        if self._has(self.yahoo, 'HYG', 'TLT'):
+            hyg, tlt, common_idx = self._pair(self.yahoo, 'HYG', 'TLT')
             
             if len(common_idx) > 20:
                 # HYG/TLT比率上升 = 信用风险偏好上升
-                ratio = hyg.loc[common_idx] / tlt.loc[common_idx]
-                current = ratio.iloc[-1]
-                change_20d = (ratio.iloc[-1] / ratio.iloc[-21] - 1) * 100 if len(ratio) > 21 else 0
+                ratio = hyg / tlt
+                current = ratio[-1]
+                change_20d = (ratio[-1] / ratio[-21] - 1) * 100 if len(ratio) > 21 else 0
                 
                 if change_20d > 2:
                     signal = '🟢 信用风险偏好上升'
@@ -697,15 +1149,13 @@ class IndicatorCalculator:
                 })
         
         # 3. 半导体/纳指 (SMH vs QQQ)
-        if 'SMH' in self.yahoo.columns and 'QQQ' in self.yahoo.columns:
-            smh = self.yahoo['SMH'].dropna()
-            qqq = self.yahoo['QQQ'].dropna()
-            common_idx = smh.index.intersection(qqq.index)
+        if self._has(self.yahoo, 'SMH', 'QQQ'):
+            smh, qqq, common_idx = self._pair(self.yahoo, 'SMH', 'QQQ')
             
             if len(common_idx) > 20:
-                ratio = smh.loc[common_idx] / qqq.loc[common_idx]
-                current = ratio.iloc[-1]
-                change_20d = (ratio.iloc[-1] / ratio.iloc[-21] - 1) * 100 if len(ratio) > 21 else 0
+                ratio = smh / qqq
+                current = ratio[-1]
+                change_20d = (ratio[-1] / ratio[-21] - 1) * 100 if len(ratio) > 21 else 0
                 
                 if change_20d > 2:
                     signal = '🟢 半导体领涨'
@@ -723,8 +1173,8 @@ class IndicatorCalculator:
                 })
         
         # 4. 2Y国债收益率变化
-        if 'DGS2' in self.fred.columns:
-            dgs2 = self.fred['DGS2'].dropna()
+        if self._has(self.fred, 'DGS2'):
+            dgs2 = self._col(self.fred, 'DGS2')
             if len(dgs2) > 20:
                 current = dgs2.iloc[-1]
                 change_20d = (dgs2.iloc[-1] - dgs2.iloc[-21]) * 100 if len(dgs2) > 21 else 0  # bp
@@ -746,8 +1196,8 @@ class IndicatorCalculator:
                 })
         
         # 5. 美元指数变化
-        if 'DX-Y.NYB' in self.yahoo.columns:
-            dxy = self.yahoo['DX-Y.NYB'].dropna()
+        if self._has(self.yahoo, 'DX-Y.NYB'):
+            dxy = self._col(self.yahoo, 'DX-Y.NYB')
             if len(dxy) > 20:
                 current = dxy.iloc[-1]
                 change_20d = (dxy.iloc[-1] / dxy.iloc[-21] - 1) * 100 if len(dxy) > 21 else 0
@@ -768,8 +1218,8 @@ class IndicatorCalculator:
                 })
         
         # 6. USDJPY变化
-        if 'JPY=X' in self.yahoo.columns:
-            usdjpy = self.yahoo['JPY=X'].dropna()
+        if self._has(self.yahoo, 'JPY=X'):
+            usdjpy = self._col(self.yahoo, 'JPY=X')
             if len(usdjpy) > 20:
                 current = usdjpy.iloc[-1]
                 change_20d = (usdjpy.iloc[-1] / usdjpy.iloc[-21] - 1) * 100 if len(usdjpy) > 21 else 0
@@ -793,6 +1243,49 @@ class IndicatorCalculator:
     
     # ==================== P1-2: 相关性变化监控 ====================
     
+    def _correlation_pair(self, pair_info, window):
+        """单个资产对的(当前相关性, 历史均值)，数据不足或相关性无定义时返回None"""
+        ticker1, ticker2 = pair_info['pair']
+        
+        # 检查数据是否存在
+        source1 = self._source_of(ticker1)
+        source2 = self._source_of(ticker2)
+        
+        if source1 is None or source2 is None:
+            return None
+        
+        # 对齐数据: 同源直接联合掩码，跨源内连接一次
+        if source1 is source2:
+            values1, values2, common_idx = self._pair(source1, ticker1, ticker2)
+            pair = pd.DataFrame({'a': values1, 'b': values2}, index=common_idx)
+        else:
+            pair = pd.concat([self._col(source1, ticker1), self._col(source2, ticker2)],
+                             axis=1, join='inner', keys=['a', 'b'])
+        if len(pair) < window + 20:
+            return None
+        
+        # 计算滚动相关性 (两侧收益率都有效的交易日)
+        returns = pair.pct_change().dropna().to_numpy(dtype=np.float64)
+        
+        if len(returns) < window:
+            return None
+        
+        # 前缀和一次求出所有窗口；收益不含NaN，内核只在退化窗口(一侧收益恒定)给出NaN
+        returns1, returns2 = np.ascontiguousarray(returns.T)
+        rolling_corr = _rolling_corr(returns1, returns2, window)
+        if np.isnan(rolling_corr).any():
+            # 含退化窗口时按pandas滚动相关计算，保持原有输出
+            rolling_corr = pd.Series(returns1).rolling(window).corr(pd.Series(returns2)).to_numpy()[window - 1:]
+        current_corr = rolling_corr[-1]
+        
+        if np.isnan(current_corr):
+            return None
+        
+        # 计算历史均值（用更长窗口）
+        hist_mean = np.nanmean(rolling_corr)
+        
+        return current_corr, hist_mean
+    
     def calc_correlation_monitor(self, window=60):
         """计算关键资产对的滚动相关性并检测异常"""
         results = []
@@ -837,77 +1330,33 @@ class IndicatorCalculator:
             },
         ]
         
+        valid_pairs = []
+        stats = []
         for pair_info in correlation_pairs:
-            ticker1, ticker2 = pair_info['pair']
-            
-            # 检查数据是否存在
-            data1 = None
-            data2 = None
-            
-            if ticker1 in self.yahoo.columns:
-                data1 = self.yahoo[ticker1].dropna()
-            elif ticker1 in self.fred.columns:
-                data1 = self.fred[ticker1].dropna()
-                
-            if ticker2 in self.yahoo.columns:
-                data2 = self.yahoo[ticker2].dropna()
-            elif ticker2 in self.fred.columns:
-                data2 = self.fred[ticker2].dropna()
-            
-            if data1 is None or data2 is None:
-                continue
-            
-            # 对齐数据
-            common_idx = data1.index.intersection(data2.index)
-            if len(common_idx) < window + 20:
-                continue
-                
-            data1 = data1.loc[common_idx]
-            data2 = data2.loc[common_idx]
-            
-            # 计算滚动相关性
-            returns1 = data1.pct_change().dropna()
-            returns2 = data2.pct_change().dropna()
-            
-            common_ret_idx = returns1.index.intersection(returns2.index)
-            returns1 = returns1.loc[common_ret_idx]
-            returns2 = returns2.loc[common_ret_idx]
-            
-            if len(returns1) < window:
-                continue
-            
-            rolling_corr = returns1.rolling(window).corr(returns2)
-            current_corr = rolling_corr.iloc[-1]
-            
-            if np.isnan(current_corr):
-                continue
-            
-            # 计算历史均值（用更长窗口）
-            hist_mean = rolling_corr.mean()
-            
-            # 判断是否异常
-            normal_low, normal_high = pair_info['normal_range']
-            
-            if current_corr > normal_high:
-                status = '🔴 异常高'
-                interpretation = pair_info['interpretation']['high']
-            elif current_corr < normal_low:
-                status = '🔴 异常低'
-                interpretation = pair_info['interpretation']['low']
-            else:
-                status = '🟢 正常'
-                interpretation = '在历史正常范围内'
-            
-            deviation = current_corr - hist_mean
+            item = self._correlation_pair(pair_info, window)
+            if item is not None:
+                valid_pairs.append(pair_info)
+                stats.append(item)
+        
+        if not stats:
+            return results
+        
+        # 一次向量比较得到状态码: 0=异常高, 1=异常低, 2=正常
+        currents, hist_means = np.array(stats).T
+        lows, highs = np.array([p['normal_range'] for p in valid_pairs], dtype=np.float64).T
+        codes = np.where(currents > highs, 0, np.where(currents < lows, 1, 2))
+        
+        for pair_info, current_corr, hist_mean, code in zip(valid_pairs, currents, hist_means, codes):
+            status, interp_key = _CORR_STATUS_CODES[code]
             
             results.append({
                 'name': pair_info['name'],
                 'current_corr': current_corr,
                 'hist_mean': hist_mean,
-                'deviation': deviation,
+                'deviation': current_corr - hist_mean,
                 'normal_range': pair_info['normal_range'],
                 'status': status,
-                'interpretation': interpretation,
+                'interpretation': pair_info['interpretation'][interp_key] if interp_key else _CORR_OK_INTERPRETATION,
             })
         
         return results
@@ -926,14 +1375,12 @@ class IndicatorCalculator:
         
         # 1. 增长代理：铜/金比率的20日变化
         growth_momentum = None
-        if 'CPER' in self.yahoo.columns and 'GLD' in self.yahoo.columns:
-            copper = self.yahoo['CPER'].dropna()
-            gold = self.yahoo['GLD'].dropna()
-            common_idx = copper.index.intersection(gold.index)
+        if self._has(self.yahoo, 'CPER', 'GLD'):
+            copper, gold, common_idx = self._pair(self.yahoo, 'CPER', 'GLD')
             
             if len(common_idx) > 21:
-                ratio = copper.loc[common_idx] / gold.loc[common_idx]
-                growth_momentum = (ratio.iloc[-1] / ratio.iloc[-21] - 1) * 100
+                ratio = copper / gold
+                growth_momentum = (ratio[-1] / ratio[-21] - 1) * 100
                 
                 results['growth_signal'] = {
                     'indicator': '铜/金比率',
@@ -943,10 +1390,10 @@ class IndicatorCalculator:
         
         # 2. 通胀代理：10Y盈亏平衡通胀的20日变化
         inflation_momentum = None
-        if 'T10YIE' in self.fred.columns:
-            bei = self.fred['T10YIE'].dropna()
+        if self._has(self.fred, 'T10YIE'):
+            bei = self._tails(self.fred_arr, self.fred_idx, ['T10YIE'], 22)['T10YIE']
             if len(bei) > 21:
-                inflation_momentum = (bei.iloc[-1] - bei.iloc[-21]) * 100  # bp
+                inflation_momentum = (bei[-1] - bei[-21]) * 100  # bp
                 
                 results['inflation_signal'] = {
                     'indicator': '10Y盈亏平衡通胀',
@@ -956,57 +1403,78 @@ class IndicatorCalculator:
         
         # 3. 辅助指标：收益率曲线变化
         curve_signal = None
-        if 'DGS10' in self.fred.columns and 'DGS2' in self.fred.columns:
-            dgs10 = self.fred['DGS10'].dropna()
-            dgs2 = self.fred['DGS2'].dropna()
-            common_idx = dgs10.index.intersection(dgs2.index)
+        if self._has(self.fred, 'DGS10', 'DGS2'):
+            dgs10, dgs2, common_idx = self._pair(self.fred, 'DGS10', 'DGS2')
             
             if len(common_idx) > 21:
-                spread = dgs10.loc[common_idx] - dgs2.loc[common_idx]
-                curve_change = (spread.iloc[-1] - spread.iloc[-21]) * 100  # bp
+                spread = dgs10 - dgs2
+                curve_change = (spread[-1] - spread[-21]) * 100  # bp
                 
                 results['curve_signal'] = {
                     'indicator': '10Y-2Y利差',
-                    'current': spread.iloc[-1] * 100,
+                    'current': spread[-1] * 100,
                     'change_20d_bp': curve_change,
                     'shape': '陡峭化' if curve_change > 0 else '平坦化',
                 }
         
         # 4. 周期判断
         if growth_momentum is not None and inflation_momentum is not None:
-            # 四象限判断
-            if growth_momentum > 1 and inflation_momentum < 5:
-                cycle = '复苏'
-                cycle_desc = '增长回升 + 通胀温和'
-                favorable = ['小盘股', '周期股', '铜', '新兴市场', '金融']
-                unfavorable = ['长期国债', '防御板块', '黄金']
-            elif growth_momentum > 1 and inflation_momentum >= 5:
-                cycle = '扩张/过热'
-                cycle_desc = '增长强劲 + 通胀升温'
-                favorable = ['商品', '能源', '价值股', '周期股']
-                unfavorable = ['长久期资产', '成长股', '债券']
-            elif growth_momentum <= 1 and inflation_momentum >= 5:
-                cycle = '滞胀'
-                cycle_desc = '增长放缓 + 通胀顽固'
-                favorable = ['商品', '黄金', '现金', '短久期']
-                unfavorable = ['股票', '长期债券', '成长股']
-            else:
-                cycle = '衰退/放缓'
-                cycle_desc = '增长放缓 + 通胀回落'
-                favorable = ['长期国债', '黄金', '防御板块', '高质量']
-                unfavorable = ['周期股', '小盘股', '新兴市场', '商品']
+            # 四象限判断: 查表 (两个动量均来自无NaN数据)
+            cycle, cycle_desc, favorable, unfavorable = _CYCLES[2 * int(growth_momentum > 1) + int(inflation_momentum >= 5)]
             
             results['cycle'] = cycle
             results['cycle_desc'] = cycle_desc
-            results['favorable_assets'] = favorable
-            results['unfavorable_assets'] = unfavorable
+            results['favorable_assets'] = list(favorable)
+            results['unfavorable_assets'] = list(unfavorable)
         
         return results
     
     # ==================== 汇总计算 ====================
     
-    def calc_all_indicators(self):
-        """计算所有指标"""
+    def _cache_key(self):
+        """指标缓存键: 源码哈希 + 手动配置的利率 + 三个数据源的列名/索引/数值哈希"""
+        h = hashlib.sha256(repr((_INDICATOR_CODE_HASH, CURRENT_FED_RATE, CURRENT_BOJ_RATE)).encode())
+        for df in (self.fred, self.yahoo, self.akshare):
+            if df is None or df.empty:
+                h.update(b'empty')
+                continue
+            h.update(repr(tuple(df.columns)).encode())
+            h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+        return h.hexdigest()[:32]
+    
+    def calc_all_indicators(self, use_cache=True):
+        """计算所有指标 (数据未变化时直接读取磁盘缓存)"""
+        cache_path = None
+        if use_cache:
+            cache_path = os.path.join(CACHE_DIR, f"{_INDICATOR_CACHE_PREFIX}{self._cache_key()}.pkl")
+            if os.path.exists(cache_path):
+                try:
+                    with open(cache_path, 'rb') as f:
+                        return pickle.load(f)
+                except Exception as e:
+                    print(f"指标缓存加载失败: {e}")
+        
+        results = self._calc_all_indicators()
+        
+        if cache_path is not None:
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                # 同一时刻只保留最新一份结果
+                for path in glob.glob(os.path.join(CACHE_DIR, f"{_INDICATOR_CACHE_PREFIX}*.pkl")):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                tmp_path = cache_path + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(results, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, cache_path)
+            except Exception as e:
+                print(f"指标缓存保存失败: {e}")
+        return results
+    
+    def _calc_all_indicators(self):
+        """实际计算所有指标"""
         return {
             'liquidity': self.calc_liquidity_indicators(),
             'currency': self.calc_currency_indicators(),
@@ -2,13 +2,39 @@
 宏观战情室 V2 - Claude Prompt 生成模块
 """
 import numpy as np
-from datetime import datetime
+from datetime import date
+
+# generate_short_summary 上次的输入与输出，输入不变时直接复用
+_last_short = {'key': None, 'out': None}
+
+# 预警级别 -> 标记 (extreme 以外均为黄色)
+_ALERT_LEVEL_EMOJI = {'extreme': '🔴'}
+
+# RS动量状态 -> prompt中的小标题 (按输出顺序)
+_RS_MOMENTUM_HEADINGS = (
+    ('加速上涨', '🚀 加速流入'),
+    ('上涨减速', '⚠️ 流入放缓(可能见顶)'),
+    ('下跌减速', '🔄 流出放缓(可能见底)'),
+    ('加速下跌', '📉 加速流出'),
+)
+
+
+# (日序号, 'YYYY-MM-DD')，同一天内复用格式化好的日期
+_cached_date = [None, None]
+
+
+def _today():
+    """当天日期字符串，每天只格式化一次"""
+    today = date.today()
+    if _cached_date[0] != today.toordinal():
+        _cached_date[:] = [today.toordinal(), today.strftime('%Y-%m-%d')]
+    return _cached_date[1]
 
 
 def generate_claude_prompt(indicators, scores, scorer, advanced=None):
     """生成Claude分析入口的prompt"""
     
-    date_str = datetime.now().strftime('%Y-%m-%d')
+    date_str = _today()
     
     # 流动性部分
     liq = indicators.get('liquidity', {})
@@ -52,9 +78,8 @@ def generate_claude_prompt(indicators, scores, scorer, advanced=None):
     unfavorable = scorer.get_unfavorable_assets()
     
     # 生成排行榜
-    ranking_str = ""
-    for i, r in enumerate(rankings[:10], 1):
-        ranking_str += f"  {i}. {r['emoji']} {r['name']}: Z={r['z']:.2f} ({r['signal']})\n"
+    ranking_str = "".join(f"  {i}. {r['emoji']} {r['name']}: Z={r['z']:.2f} ({r['signal']})\n"
+                          for i, r in enumerate(rankings[:10], 1))
     
     # 生成美股结构因子
     def format_factors(factor_list):
@@ -67,16 +92,15 @@ def generate_claude_prompt(indicators, scores, scorer, advanced=None):
     breadth_factors = format_factors(us.get('breadth', []))
     
     # 生成预警
-    alerts_str = ""
     if alerts:
-        for a in alerts[:10]:
-            level_emoji = '🔴' if a['level'] == 'extreme' else '🟡'
-            alerts_str += f"- {level_emoji} [{a['category']}] {a['indicator']}: Z={a['z']:.2f}\n  → {a['message']}\n"
+        alerts_str = "".join(
+            f"- {_ALERT_LEVEL_EMOJI.get(a['level'], '🟡')} [{a['category']}] {a['indicator']}: Z={a['z']:.2f}\n  → {a['message']}\n"
+            for a in alerts[:10])
     else:
         alerts_str = "- 无重大预警信号\n"
     
-    # 组装prompt
-    prompt = f"""## 宏观战情室数据摘要 ({date_str})
+    # 组装prompt: 各段先放入列表，最后一次拼接
+    parts = [f"""## 宏观战情室数据摘要 ({date_str})
 
 ### 一、流动性环境
 - 净流动性: {net_liq.get('latest', 'N/A'):.2f}万亿美元
@@ -117,12 +141,11 @@ def generate_claude_prompt(indicators, scores, scorer, advanced=None):
 **相对强度排行 (vs SPY, 20日RS, Z-Score):**
 {ranking_str}
 **极端情绪指标:**
-"""
+"""]
     
-    for ticker, data in extreme.items():
-        prompt += f"- {data['name']}: Z={data['z']:.2f}σ ({data['sentiment']})\n"
+    parts.extend(f"- {data['name']}: Z={data['z']:.2f}σ ({data['sentiment']})\n" for data in extreme.values())
     
-    prompt += f"""
+    parts.append(f"""
 - **轮动评分: {rot_score.get('score', 0):.1f}/100** ({rot_score.get('interpretation', '')})
 
 ### 五、美股内部结构
@@ -146,7 +169,7 @@ def generate_claude_prompt(indicators, scores, scorer, advanced=None):
 
 ### 七、预警信号
 {alerts_str}
-"""
+""")
 
     # 添加新增的分析数据（直接从indicators获取）
     # 经济周期
@@ -154,7 +177,7 @@ def generate_claude_prompt(indicators, scores, scorer, advanced=None):
     if cycle.get('cycle') and cycle.get('cycle') != 'N/A':
         growth_signal = cycle.get('growth_signal', {})
         inflation_signal = cycle.get('inflation_signal', {})
-        prompt += f"""
+        parts.append(f"""
 ### 八、经济周期定位
 - **当前周期: {cycle.get('cycle', 'N/A')}**
 - 描述: {cycle.get('cycle_desc', '')}
@@ -162,34 +185,31 @@ def generate_claude_prompt(indicators, scores, scorer, advanced=None):
 - 通胀信号: 通胀预期20日变化 {inflation_signal.get('change_20d_bp', 0):+.0f}bp ({inflation_signal.get('direction', 'N/A')})
 - 周期有利资产: {', '.join(cycle.get('favorable_assets', []))}
 - 周期不利资产: {', '.join(cycle.get('unfavorable_assets', []))}
-"""
+""")
 
     # RS动量
     rs_momentum = indicators.get('rs_momentum', [])
     if rs_momentum:
-        prompt += """
+        parts.append("""
 ### 九、RS动量分析 (资金流动方向)
-"""
-        acc_up = [x for x in rs_momentum if x['status'] == '加速上涨']
-        dec_up = [x for x in rs_momentum if x['status'] == '上涨减速']
-        dec_down = [x for x in rs_momentum if x['status'] == '下跌减速']
-        acc_down = [x for x in rs_momentum if x['status'] == '加速下跌']
+""")
+        # 单次遍历按状态分组
+        buckets = {status: [] for status, _ in _RS_MOMENTUM_HEADINGS}
+        for x in rs_momentum:
+            names = buckets.get(x['status'])
+            if names is not None:
+                names.append(x['name'])
         
-        if acc_up:
-            prompt += f"**🚀 加速流入:** {', '.join([x['name'] for x in acc_up[:4]])}\n"
-        if dec_up:
-            prompt += f"**⚠️ 流入放缓(可能见顶):** {', '.join([x['name'] for x in dec_up[:4]])}\n"
-        if dec_down:
-            prompt += f"**🔄 流出放缓(可能见底):** {', '.join([x['name'] for x in dec_down[:4]])}\n"
-        if acc_down:
-            prompt += f"**📉 加速流出:** {', '.join([x['name'] for x in acc_down[:4]])}\n"
+        for status, heading in _RS_MOMENTUM_HEADINGS:
+            if buckets[status]:
+                parts.append(f"**{heading}:** {', '.join(buckets[status][:4])}\n")
 
     # 领先指标
     leading = indicators.get('leading_indicators', [])
     if leading:
-        prompt += """
+        parts.append("""
 ### 十、领先指标信号
-"""
+""")
         for ind in leading:
             change_val = ind.get('change_20d', 0)
             unit = ind.get('unit', '%')
@@ -197,19 +217,20 @@ def generate_claude_prompt(indicators, scores, scorer, advanced=None):
                 change_str = f"{change_val:+.0f}bp"
             else:
                 change_str = f"{change_val:+.1f}%"
-            prompt += f"- {ind['name']}: {ind['value']} (20日变化: {change_str}) {ind['signal']}\n"
+            parts.append(f"- {ind['name']}: {ind['value']} (20日变化: {change_str}) {ind['signal']}\n")
 
     # 相关性异常
     corr = indicators.get('correlation_monitor', [])
-    abnormal = [c for c in corr if '异常' in c.get('status', '')]
-    if abnormal:
-        prompt += """
+    if corr:
+        abnormal = [c for c in corr if '异常' in c.get('status', '')]
+        if abnormal:
+            parts.append("""
 ### 十一、相关性异常
-"""
-        for c in abnormal:
-            prompt += f"- {c['name']}: 当前{c['current_corr']:.2f} vs 历史均值{c['hist_mean']:.2f} - {c['interpretation']}\n"
+""")
+            parts.extend(f"- {c['name']}: 当前{c['current_corr']:.2f} vs 历史均值{c['hist_mean']:.2f} - {c['interpretation']}\n"
+                         for c in abnormal)
 
-    prompt += """
+    parts.append("""
 ---
 
 **请基于以上数据进行分析：**
@@ -229,7 +250,8 @@ def generate_claude_prompt(indicators, scores, scorer, advanced=None):
 7. **资产配置建议**: 综合以上分析，给出当前环境下的资产配置倾向性建议。
 
 请用中文回答，语言简洁专业，重点突出。
-"""
+""")
+    prompt = ''.join(parts)
     
     return prompt
 
@@ -237,7 +259,7 @@ def generate_claude_prompt(indicators, scores, scorer, advanced=None):
 def generate_short_summary(indicators, scores, scorer):
     """生成简短的摘要版本"""
     
-    date_str = datetime.now().strftime('%Y-%m-%d')
+    date_str = _today()
     total = scores.get('total', {})
     
     liq_score = scores.get('liquidity', {}).get('score', 0)
@@ -251,6 +273,13 @@ def generate_short_summary(indicators, scores, scorer):
     alerts = scorer.get_alerts()
     alert_count = len([a for a in alerts if a['level'] == 'extreme'])
     
+    # 摘要中出现的所有值都在key里
+    key = (date_str, total.get('score', 0), total.get('interpretation', ''),
+           liq_score, curr_score, rot_score, us_score,
+           tuple(favorable), tuple(unfavorable), alert_count)
+    if _last_short['key'] == key:
+        return _last_short['out']
+    
     summary = f"""📊 宏观战情室 ({date_str})
 
 综合评分: {total.get('score', 0):.1f}/100 | {total.get('interpretation', '')}
@@ -265,6 +294,7 @@ def generate_short_summary(indicators, scores, scorer):
 预警: {alert_count}个极端信号 {'⚠️' if alert_count > 0 else '✅'}
 """
     
+    _last_short.update(key=key, out=summary)
     return summary
 
 
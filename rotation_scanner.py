@@ -10,17 +10,117 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import glob
+import hashlib
+import io
+import os
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import warnings
 warnings.filterwarnings('ignore')
 
+from config import CACHE_DIR
+
 try:
     import yfinance as yf
 except ImportError:
     yf = None
 
+# 可选: numba JIT加速数值内核 (未安装时退回NumPy实现)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# 模块共享HTTP会话: 复用 keep-alive 连接，避免每个请求重新握手；
+# 临时错误自动重试，重试用尽后返回最后一次响应，由调用方按状态码处理
+_HTTP_SESSION = requests.Session()
+_HTTP_ADAPTER = HTTPAdapter(
+    pool_connections=8, pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504],
+                      raise_on_status=False),
+)
+_HTTP_SESSION.mount('http://', _HTTP_ADAPTER)
+_HTTP_SESSION.mount('https://', _HTTP_ADAPTER)
+
+# 网络数据的本地磁盘缓存目录
+_DISK_CACHE_DIR = CACHE_DIR
+
+
+def _write_cache_file(cache_path, content):
+    """写入缓存文件: 先写临时文件再替换，避免并发读到半截文件；失败只打印不抛出"""
+    try:
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"缓存写入失败: {e}")
+
+
+def _cache_fresh(cache_path, hours):
+    """缓存文件存在且未超过有效期"""
+    return os.path.exists(cache_path) and time.time() - os.path.getmtime(cache_path) < hours * 3600
+
 # ==================== SOFR/Repo 数据获取 ====================
 
+# 需要获取的担保利率
+_NYFED_RATES = ('sofr', 'tgcr', 'bgcr')
+
+# 合并后的利率窗口按 (起止日期) 缓存，同一天内重复调用不再请求网络
+_NYFED_CACHE_PREFIX = 'nyfed_rates_'
+_NYFED_CACHE_HOURS = 2
+
+
+def _fetch_nyfed_rate(rate, start_date, end_date):
+    """获取单个NY Fed担保利率，返回按日期索引的利率Series (同一日期保留最后一条)"""
+    url = f"https://markets.newyorkfed.org/api/rates/secured/{rate}/search.json?startDate={start_date}&endDate={end_date}"
+    r = _HTTP_SESSION.get(url, timeout=15)
+    rate_data = pd.Series(dtype='float64')
+    if r.status_code == 200:
+        ref_rates = r.json().get('refRates', [])
+        if ref_rates:
+            df = pd.json_normalize(ref_rates).reindex(columns=['effectiveDate', 'percentRate'])
+            rate_data = pd.Series(df['percentRate'].fillna(0).astype('float64').to_numpy(),
+                                  index=df['effectiveDate'].fillna('').to_numpy())
+            rate_data = rate_data[~rate_data.index.duplicated(keep='last')]
+    return rate_data
+
+
+def _nyfed_rates(start_date, end_date):
+    """获取 SOFR / TGCR / BGCR 三个利率Series；三者都有数据时整体缓存到本地"""
+    cache_path = os.path.join(_DISK_CACHE_DIR, f"{_NYFED_CACHE_PREFIX}{start_date}_{end_date}.csv")
+    if _cache_fresh(cache_path, _NYFED_CACHE_HOURS):
+        try:
+            cached = pd.read_csv(cache_path, index_col=0, dtype={0: str}, float_precision='round_trip')
+            return tuple(cached[rate].dropna() for rate in _NYFED_RATES)
+        except Exception as e:
+            print(f"NY Fed缓存加载失败: {e}")
+    
+    # 并发获取 SOFR / TGCR (Tri-Party General Collateral Rate) / BGCR (Broad General Collateral Rate)
+    with ThreadPoolExecutor(max_workers=len(_NYFED_RATES)) as pool:
+        futures = [pool.submit(_fetch_nyfed_rate, rate, start_date, end_date) for rate in _NYFED_RATES]
+        series = tuple(f.result() for f in futures)
+    
+    # 只缓存完整结果 (任一利率缺失时下次重新请求)，并清理旧窗口的缓存
+    if all(len(s) for s in series):
+        merged = pd.concat(series, axis=1, keys=_NYFED_RATES)
+        _write_cache_file(cache_path, merged.to_csv().encode('utf-8'))
+        for path in glob.glob(os.path.join(_DISK_CACHE_DIR, f"{_NYFED_CACHE_PREFIX}*.csv")):
+            if path != cache_path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+    
+    return series
+
+
 def get_sofr_repo_history(days=30):
     """
     获取 SOFR 和 Repo 利率的历史数据
@@ -44,52 +144,25 @@ def get_sofr_repo_history(days=30):
         end_date = datetime.now().date()
         start_date = end_date - timedelta(days=days + 15)  # 多取一些确保有足够数据
         
-        # 获取 SOFR 数据
-        sofr_url = f"https://markets.newyorkfed.org/api/rates/secured/sofr/search.json?startDate={start_date}&endDate={end_date}"
-        r_sofr = requests.get(sofr_url, timeout=15)
-        sofr_data = {}
-        if r_sofr.status_code == 200:
-            data = r_sofr.json()
-            for item in data.get('refRates', []):
-                date = item.get('effectiveDate', '')
-                rate = item.get('percentRate', 0)
-                sofr_data[date] = float(rate)
+        # SOFR / TGCR (Tri-Party General Collateral Rate) / BGCR (Broad General Collateral Rate)
+        sofr_data, tgcr_data, bgcr_data = _nyfed_rates(start_date, end_date)
         
-        # 获取 TGCR 数据 (Tri-Party General Collateral Rate)
-        tgcr_url = f"https://markets.newyorkfed.org/api/rates/secured/tgcr/search.json?startDate={start_date}&endDate={end_date}"
-        r_tgcr = requests.get(tgcr_url, timeout=15)
-        tgcr_data = {}
-        if r_tgcr.status_code == 200:
-            data = r_tgcr.json()
-            for item in data.get('refRates', []):
-                date = item.get('effectiveDate', '')
-                rate = item.get('percentRate', 0)
-                tgcr_data[date] = float(rate)
+        # 合并数据 - 取共同日期，BGCR缺失日期记为0
+        common_dates = sofr_data.index
+        if len(tgcr_data):
+            common_dates = common_dates.intersection(tgcr_data.index)
+        all_dates = common_dates.sort_values()[-days:]
         
-        # 获取 BGCR 数据 (Broad General Collateral Rate)
-        bgcr_url = f"https://markets.newyorkfed.org/api/rates/secured/bgcr/search.json?startDate={start_date}&endDate={end_date}"
-        r_bgcr = requests.get(bgcr_url, timeout=15)
-        bgcr_data = {}
-        if r_bgcr.status_code == 200:
-            data = r_bgcr.json()
-            for item in data.get('refRates', []):
-                date = item.get('effectiveDate', '')
-                rate = item.get('percentRate', 0)
-                bgcr_data[date] = float(rate)
-        
-        # 合并数据 - 取共同日期
-        common_dates = set(sofr_data.keys())
-        if tgcr_data:
-            common_dates = common_dates & set(tgcr_data.keys())
-        all_dates = sorted(common_dates)[-days:]
-        
-        for date in all_dates:
-            result['dates'].append(date)
-            result['sofr'].append(sofr_data.get(date, 0))
-            result['tgcr'].append(tgcr_data.get(date, 0))
-            result['bgcr'].append(bgcr_data.get(date, 0))
-            spread = sofr_data.get(date, 0) - tgcr_data.get(date, 0)
-            result['spread'].append(spread)
+        rates = pd.DataFrame({
+            'sofr': sofr_data.reindex(all_dates),
+            'tgcr': tgcr_data.reindex(all_dates, fill_value=0),
+            'bgcr': bgcr_data.reindex(all_dates, fill_value=0),
+        })
+        result['dates'] = all_dates.tolist()
+        result['sofr'] = rates['sofr'].tolist()
+        result['tgcr'] = rates['tgcr'].tolist()
+        result['bgcr'] = rates['bgcr'].tolist()
+        result['spread'] = (rates['sofr'] - rates['tgcr']).tolist()
         
         if result['sofr']:
             result['current_sofr'] = result['sofr'][-1]
@@ -114,6 +187,29 @@ def get_sofr_repo_history(days=30):
     return result
 
 
+# FRED CSV 磁盘缓存有效期 (FRED每日更新)
+_FRED_CACHE_HOURS = 6
+
+# FRED CSV 固定两列 (日期, 数值)，直接指定类型免去推断；'.' 表示缺失
+_FRED_CSV_OPTIONS = dict(usecols=[0, 1], parse_dates=[0], dtype={1: 'float64'}, na_values=['.'])
+
+
+def _fred_csv(series_id):
+    """读取FRED序列CSV，成功下载的原始文件缓存到本地，有效期内不再请求网络"""
+    cache_path = os.path.join(_DISK_CACHE_DIR, f"fred_{series_id}.csv")
+    if _cache_fresh(cache_path, _FRED_CACHE_HOURS):
+        try:
+            return pd.read_csv(cache_path, **_FRED_CSV_OPTIONS)
+        except Exception as e:
+            print(f"FRED缓存加载失败: {e}")
+    
+    r = _HTTP_SESSION.get(f"https://fred.stlouisfed.org/graph/fredgraph.csv?id={series_id}", timeout=30)
+    r.raise_for_status()
+    _write_cache_file(cache_path, r.content)
+    
+    return pd.read_csv(io.BytesIO(r.content), **_FRED_CSV_OPTIONS)
+
+
 def get_rrp_tga_history(days=30):
     """
     获取 RRP 和 TGA 的历史数据
@@ -132,43 +228,37 @@ def get_rrp_tga_history(days=30):
     
     try:
         # RRP (Overnight Reverse Repo)
-        rrp_url = "https://fred.stlouisfed.org/graph/fredgraph.csv?id=RRPONTSYD"
-        rrp_df = pd.read_csv(rrp_url)
+        rrp_df = _fred_csv('RRPONTSYD')
         
         # 自动检测列名
         date_col = rrp_df.columns[0]
         rrp_col = 'RRPONTSYD' if 'RRPONTSYD' in rrp_df.columns else rrp_df.columns[1]
         
         rrp_df = rrp_df.dropna().tail(days + 5)
-        rrp_df[date_col] = pd.to_datetime(rrp_df[date_col])
         
         # TGA (Treasury General Account) - 周度数据
-        tga_url = "https://fred.stlouisfed.org/graph/fredgraph.csv?id=WTREGEN"
-        tga_df = pd.read_csv(tga_url)
+        tga_df = _fred_csv('WTREGEN')
         
         tga_date_col = tga_df.columns[0]
         tga_col = 'WTREGEN' if 'WTREGEN' in tga_df.columns else tga_df.columns[1]
         
         tga_df = tga_df.dropna().tail(days + 5)
-        tga_df[tga_date_col] = pd.to_datetime(tga_df[tga_date_col])
         
         # 取最近 days 天的 RRP 数据
-        result['dates'] = rrp_df[date_col].dt.strftime('%Y-%m-%d').tolist()[-days:]
-        result['rrp'] = rrp_df[rrp_col].tolist()[-days:]
+        recent = rrp_df.iloc[-days:]
+        result['dates'] = recent[date_col].dt.strftime('%Y-%m-%d').tolist()
+        result['rrp'] = recent[rrp_col].tolist()
         
-        # TGA 是周度数据，需要前向填充对齐
-        tga_dict = dict(zip(tga_df[tga_date_col].dt.strftime('%Y-%m-%d'), tga_df[tga_col]))
-        result['tga'] = []
-        last_tga = list(tga_dict.values())[-1] if tga_dict else 0
-        for d in result['dates']:
-            if d in tga_dict:
-                last_tga = tga_dict[d]
-            result['tga'].append(last_tga / 1000)  # 转换为十亿美元
+        # TGA 是周度数据，需要前向填充对齐: RRP日期与TGA同日时取当日值并向后沿用，首个同日之前沿用最新TGA
+        tga_by_date = pd.Series(tga_df[tga_col].to_numpy(), index=tga_df[tga_date_col].to_numpy())
+        tga_by_date = tga_by_date[~tga_by_date.index.duplicated(keep='last')]
+        latest_tga = tga_by_date.iloc[-1] if len(tga_by_date) else 0
+        tga = tga_by_date.reindex(recent[date_col].to_numpy()).ffill().fillna(latest_tga).to_numpy(dtype=np.float64)
+        tga = tga / 1000  # 转换为十亿美元
+        result['tga'] = tga.tolist()
         
         # 计算净抽水
-        for i in range(len(result['dates'])):
-            net = result['rrp'][i] + result['tga'][i] * 1000  # TGA单位是百万
-            result['net_drain'].append(net)
+        result['net_drain'] = (recent[rrp_col].to_numpy(dtype=np.float64) + tga * 1000).tolist()  # TGA单位是百万
         
         if result['rrp']:
             result['current_rrp'] = result['rrp'][-1]
@@ -220,8 +310,57 @@ SECTOR_ETFS = {
     'IWD': ('价值', 'Value'),
 }
 
+# SECTOR_ETFS 的并列数组形式，扫描时按掩码批量取用
+_SECTOR_TICKERS = np.array(list(SECTOR_ETFS))
+_SECTOR_NAMES_CN = np.array([name_cn for name_cn, _ in SECTOR_ETFS.values()])
+_SECTOR_INDEX = pd.Index(_SECTOR_TICKERS)
+
+
+def _sector_columns(yahoo_data):
+    """SECTOR_ETFS 中出现在行情数据里的ETF掩码"""
+    return _SECTOR_INDEX.isin(yahoo_data.columns)
+
+
+def _valid_tails(values, n):
+    """
+    每列取最后n个有效值 (跳过NaN)，返回 (n×K矩阵, 每列有效值个数)
+    有效值不足n个的列在顶部以NaN补齐
+    """
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=0)
+    # 每个有效值距列尾的名次 (最后一个有效值为1)
+    rank_from_end = valid[::-1].cumsum(axis=0)[::-1]
+    rows, cols = np.nonzero(valid & (rank_from_end <= n))
+    tail = np.full((n, values.shape[1]), np.nan)
+    tail[n - rank_from_end[rows, cols], cols] = values[rows, cols]
+    return tail, counts
+
+
+def _window_mean(window):
+    """按列求窗口均值，窗口内数值恒定时直接取该值"""
+    mean = window.mean(axis=0)
+    return np.where(window.max(axis=0) == window.min(axis=0), window[-1], mean)
 
-def scan_etf_flows(yahoo_data=None, lookback=20):
+
+# scan_etf_flows 结果缓存: {key: (计算时间, DataFrame)}
+_SCAN_CACHE = {}
+_SCAN_CACHE_TTL = 900  # 秒
+_SCAN_CACHE_SIZE = 8
+
+
+def _scan_cache_key(yahoo_data, lookback):
+    """扫描缓存key: 传入数据时按参与扫描的ETF列内容哈希，未传入数据(走yfinance下载)时按lookback；无法哈希返回None"""
+    if yahoo_data is None or yahoo_data.empty:
+        return (lookback, 'yfinance')
+    tickers = _SECTOR_TICKERS[_sector_columns(yahoo_data)]
+    try:
+        hashes = pd.util.hash_pandas_object(yahoo_data[tickers], index=True).to_numpy()
+    except (TypeError, ValueError):
+        return None
+    return (lookback, tuple(tickers.tolist()), hashlib.sha1(hashes.tobytes()).hexdigest())
+
+
+def scan_etf_flows(yahoo_data=None, lookback=20, use_cache=True):
     """
     扫描ETF资金流入信号
     
@@ -233,106 +372,108 @@ def scan_etf_flows(yahoo_data=None, lookback=20):
     5. 20日涨幅 > 0 (+1)
     
     返回: DataFrame with columns ['ETF', '板块', '价格', '>SMA20', '>SMA50', '放量', 'OBV↑', '20日涨幅%', '评分']
+    
+    相同数据在 _SCAN_CACHE_TTL 秒内重复扫描直接返回缓存结果的副本，use_cache=False 强制重算
     """
-    results = []
+    key = _scan_cache_key(yahoo_data, lookback) if use_cache else None
+    now = time.time()
+    if key is not None:
+        hit = _SCAN_CACHE.get(key)
+        if hit is not None and now - hit[0] < _SCAN_CACHE_TTL:
+            return hit[1].copy()
+    
+    df = _scan_etf_flows(yahoo_data, lookback)
+    
+    # 只缓存非空结果，下载失败等情况下次重试
+    if key is not None and not df.empty:
+        _SCAN_CACHE.pop(key, None)
+        _SCAN_CACHE[key] = (now, df.copy())
+        while len(_SCAN_CACHE) > _SCAN_CACHE_SIZE:
+            _SCAN_CACHE.pop(next(iter(_SCAN_CACHE)))
     
+    return df
+
+
+def _scan_etf_flows(yahoo_data, lookback):
+    """scan_etf_flows 的实际计算"""
     # 如果没有传入数据，尝试用yfinance获取
     if yahoo_data is None or yahoo_data.empty:
         if yf is None:
             return pd.DataFrame()
         try:
-            tickers = list(SECTOR_ETFS.keys())
-            yahoo_data = yf.download(tickers, period='3mo', progress=False)
+            tickers = _SECTOR_TICKERS.tolist()
+            # yfinance 按ticker并发下载 (线程池)，网络等待相互重叠
+            yahoo_data = yf.download(tickers, period='3mo', progress=False, threads=True)
             if isinstance(yahoo_data.columns, pd.MultiIndex):
                 yahoo_data = yahoo_data['Close']
         except Exception as e:
             print(f"ETF数据获取失败: {e}")
             return pd.DataFrame()
     
-    for ticker, (name_cn, name_en) in SECTOR_ETFS.items():
-        if ticker not in yahoo_data.columns:
-            continue
-            
-        try:
-            prices = yahoo_data[ticker].dropna()
-            if len(prices) < 50:
-                continue
-            
-            # 计算指标
-            sma20 = prices.rolling(20).mean()
-            sma50 = prices.rolling(50).mean()
-            
-            latest = prices.iloc[-1]
-            prev_20d = prices.iloc[-21] if len(prices) > 20 else prices.iloc[0]
-            prev_5d = prices.iloc[-6] if len(prices) > 5 else prices.iloc[0]
-            
-            # 计算OBV (简化版，用价格变化方向)
-            price_diff = prices.diff()
-            obv_direction = (price_diff.iloc[-5:] > 0).sum() > 2.5  # 近5天多数上涨
-            
-            # 评分
-            score = 0
-            signals = {}
-            
-            # 1. 价格 > SMA20
-            above_sma20 = latest > sma20.iloc[-1]
-            signals['>SMA20'] = '✅' if above_sma20 else '❌'
-            if above_sma20:
-                score += 1
-            
-            # 2. 价格 > SMA50
-            above_sma50 = latest > sma50.iloc[-1] if not pd.isna(sma50.iloc[-1]) else False
-            signals['>SMA50'] = '✅' if above_sma50 else '❌'
-            if above_sma50:
-                score += 1
-            
-            # 3. 近期动量 (简化: 5日涨幅 > 0)
-            mom_5d = (latest / prev_5d - 1) * 100
-            signals['动量'] = '✅' if mom_5d > 0 else '❌'
-            if mom_5d > 0:
-                score += 1
-            
-            # 4. OBV方向
-            signals['OBV↑'] = '✅' if obv_direction else '❌'
-            if obv_direction:
-                score += 1
-            
-            # 5. 20日涨幅
-            returns_20d = (latest / prev_20d - 1) * 100
-            if returns_20d > 0:
-                score += 1
-            
-            # 信号强度
-            if score >= 4:
-                signal = '🟢'
-            elif score >= 3:
-                signal = '🟡'
-            elif score <= 1:
-                signal = '🔴'
-            else:
-                signal = '⚪'
-            
-            results.append({
-                'ETF': ticker,
-                '板块': name_cn,
-                '信号': signal,
-                '价格': round(latest, 2),
-                '>SMA20': signals['>SMA20'],
-                '>SMA50': signals['>SMA50'],
-                '动量': signals['动量'],
-                'OBV↑': signals['OBV↑'],
-                '20日%': round(returns_20d, 1),
-                '评分': score,
-            })
-            
-        except Exception as e:
-            print(f"ETF {ticker} 扫描失败: {e}")
-            continue
+    present = _sector_columns(yahoo_data)
+    if not present.any():
+        return pd.DataFrame()
+    tickers = _SECTOR_TICKERS[present]
+    names_cn = _SECTOR_NAMES_CN[present]
+    
+    # 非数值列无法计算，扫描前一次性剔除并统一提示
+    block = yahoo_data[tickers]
+    numeric = np.array([pd.api.types.is_numeric_dtype(dt) and not pd.api.types.is_bool_dtype(dt)
+                        for dt in block.dtypes])
+    if not numeric.all():
+        print(f"ETF扫描跳过非数值数据: {', '.join(tickers[~numeric])}")
+    
+    # 各ETF缺失日期不同，按列取最近50个有效价格 (不足50个的ETF不参与评分)
+    tail, counts = _valid_tails(block.loc[:, numeric].to_numpy(dtype=np.float64), 50)
+    
+    valid = numeric.copy()
+    valid[numeric] = counts >= 50
+    if not valid.any():
+        return pd.DataFrame()
+    tickers = tickers[valid]
+    names_cn = names_cn[valid]
+    tail = tail[:, counts >= 50]
+    
+    latest = tail[-1]
+    prev_20d = tail[-21]
+    prev_5d = tail[-6]
+    
+    # 窗口内价格恒定时均值就是该价格，避免求和舍入误差造成误判
+    sma20 = _window_mean(tail[-20:])
+    sma50 = _window_mean(tail)
+    
+    # 1. 价格 > SMA20
+    above_sma20 = latest > sma20
+    # 2. 价格 > SMA50
+    above_sma50 = latest > sma50
+    # 3. 近期动量 (简化: 5日涨幅 > 0)
+    mom_5d = (latest / prev_5d - 1) * 100
+    # 4. OBV方向 (简化版，近5天多数上涨)
+    obv_direction = (np.diff(tail[-6:], axis=0) > 0).sum(axis=0) > 2.5
+    # 5. 20日涨幅
+    returns_20d = (latest / prev_20d - 1) * 100
+    
+    score = (above_sma20.astype(np.int64) + above_sma50 + (mom_5d > 0)
+             + obv_direction + (returns_20d > 0))
+    
+    # 信号强度
+    signal = np.select([score >= 4, score >= 3, score <= 1], ['🟢', '🟡', '🔴'], '⚪')
+    
+    df = pd.DataFrame({
+        'ETF': tickers,
+        '板块': names_cn,
+        '信号': signal,
+        '价格': np.round(latest, 2),
+        '>SMA20': np.where(above_sma20, '✅', '❌'),
+        '>SMA50': np.where(above_sma50, '✅', '❌'),
+        '动量': np.where(mom_5d > 0, '✅', '❌'),
+        'OBV↑': np.where(obv_direction, '✅', '❌'),
+        '20日%': np.round(returns_20d, 1),
+        '评分': score,
+    })
     
     # 排序
-    df = pd.DataFrame(results)
-    if not df.empty:
-        df = df.sort_values('评分', ascending=False)
+    df = df.sort_values('评分', ascending=False)
     
     return df
 
@@ -350,9 +491,12 @@ def get_etf_flow_summary(scan_results):
             'summary': '数据不足',
         }
     
-    strong = scan_results[scan_results['评分'] >= 4]['板块'].tolist()
-    weak = scan_results[scan_results['评分'] <= 1]['板块'].tolist()
-    neutral = scan_results[(scan_results['评分'] > 1) & (scan_results['评分'] < 4)]['板块'].tolist()
+    # 评分列只取一次，三组掩码直接索引板块名
+    scores = scan_results['评分'].to_numpy()
+    names = scan_results['板块'].to_numpy()
+    strong = names[scores >= 4].tolist()
+    weak = names[scores <= 1].tolist()
+    neutral = names[(scores > 1) & (scores < 4)].tolist()
     
     # Risk-On 评分: 强势板块数 - 弱势板块数
     risk_on_score = len(strong) - len(weak)
@@ -376,6 +520,40 @@ def get_etf_flow_summary(scan_results):
 
 # ==================== 市场广度雷达图数据 ====================
 
+def _z_last_numpy(values, window):
+    """最后window个值中最新值的Z-Score (ddof=1)，窗口内数值恒定时为0"""
+    recent = values[-window:]
+    if (recent == recent[0]).all():
+        return 0.0
+    return float((recent[-1] - recent.mean()) / recent.std(ddof=1))
+
+
+def _z_last_loop(values, window):
+    """同上，两遍扫描 (供numba编译)"""
+    n = values.shape[0]
+    first = values[n - window]
+    s = 0.0
+    const = True
+    for i in range(n - window, n):
+        s += values[i]
+        if values[i] != first:
+            const = False
+    if const:
+        return 0.0
+    mean = s / window
+    ss = 0.0
+    for i in range(n - window, n):
+        d = values[i] - mean
+        ss += d * d
+    return (values[n - 1] - mean) / np.sqrt(ss / (window - 1))
+
+
+if NUMBA_AVAILABLE:
+    _z_last = njit(cache=True)(_z_last_loop)
+else:
+    _z_last = _z_last_numpy
+
+
 def calculate_breadth_radar(indicators, yahoo_data=None):
     """
     计算市场广度雷达图数据
@@ -400,12 +578,7 @@ def calculate_breadth_radar(indicators, yahoo_data=None):
     def calc_zscore(series, window=60):
         if series is None or len(series) < window:
             return 0
-        recent = series.iloc[-window:]
-        mean = recent.mean()
-        std = recent.std()
-        if std == 0:
-            return 0
-        return (series.iloc[-1] - mean) / std
+        return _z_last(series.to_numpy(dtype=np.float64), window)
     
     # 1. 流动性 (净流动性Z-Score, 正值利好)
     liq = indicators.get('liquidity', {})
@@ -413,9 +586,6 @@ def calculate_breadth_radar(indicators, yahoo_data=None):
     liq_z = net_liq.get('z_60d', 0) if net_liq else 0
     if pd.isna(liq_z):
         liq_z = 0
-    radar_data['values'].append(liq_z)
-    radar_data['normalized'].append(min(100, max(0, (liq_z + 3) / 6 * 100)))
-    radar_data['signals'].append('🟢' if liq_z > 0.5 else '🔴' if liq_z < -0.5 else '⚪')
     radar_data['raw_values']['流动性'] = {'z': liq_z, 'desc': '净流动性'}
     
     # 2. 风险偏好 (HYG/LQD Z-Score, 正值利好)
@@ -423,9 +593,6 @@ def calculate_breadth_radar(indicators, yahoo_data=None):
     risk_z = hyg_lqd.get('z_60d', 0) if hyg_lqd else 0
     if pd.isna(risk_z):
         risk_z = 0
-    radar_data['values'].append(risk_z)
-    radar_data['normalized'].append(min(100, max(0, (risk_z + 3) / 6 * 100)))
-    radar_data['signals'].append('🟢' if risk_z > 0.5 else '🔴' if risk_z < -0.5 else '⚪')
     radar_data['raw_values']['风险偏好'] = {'z': risk_z, 'desc': 'HYG/LQD'}
     
     # 3. 汇率环境 (DXY Z-Score 取反, 弱美元利好)
@@ -435,9 +602,6 @@ def calculate_breadth_radar(indicators, yahoo_data=None):
     if pd.isna(dxy_z):
         dxy_z = 0
     fx_z = -dxy_z  # 取反: 弱美元利好
-    radar_data['values'].append(fx_z)
-    radar_data['normalized'].append(min(100, max(0, (fx_z + 3) / 6 * 100)))
-    radar_data['signals'].append('🟢' if fx_z > 0.5 else '🔴' if fx_z < -0.5 else '⚪')
     radar_data['raw_values']['汇率环境'] = {'z': fx_z, 'desc': 'DXY反向'}
     
     # 4. 波动率 (VIX Z-Score 取反, 低波动利好)
@@ -446,9 +610,6 @@ def calculate_breadth_radar(indicators, yahoo_data=None):
     if pd.isna(vix_z):
         vix_z = 0
     vol_z = -vix_z  # 取反: 低VIX利好
-    radar_data['values'].append(vol_z)
-    radar_data['normalized'].append(min(100, max(0, (vol_z + 3) / 6 * 100)))
-    radar_data['signals'].append('🟢' if vol_z > 0.5 else '🔴' if vol_z < -0.5 else '⚪')
     radar_data['raw_values']['波动率'] = {'z': vol_z, 'desc': 'VIX反向'}
     
     # 5. 市场广度 (小盘/大盘 Z-Score, 正值表示小盘股走强)
@@ -473,13 +634,16 @@ def calculate_breadth_radar(indicators, yahoo_data=None):
                 if len(ratio) > 60:
                     breadth_z = calc_zscore(ratio, 60)
     
-    radar_data['values'].append(breadth_z)
-    radar_data['normalized'].append(min(100, max(0, (breadth_z + 3) / 6 * 100)))
-    radar_data['signals'].append('🟢' if breadth_z > 0.5 else '🔴' if breadth_z < -0.5 else '⚪')
     radar_data['raw_values']['市场广度'] = {'z': breadth_z, 'desc': 'IWM/SPY'}
     
+    # 五个维度一起归一化 (Z-Score -3~+3 映射到 0~100) 并生成信号
+    zs = np.array([liq_z, risk_z, fx_z, vol_z, breadth_z], dtype=np.float64)
+    radar_data['values'] = zs.tolist()
+    radar_data['normalized'] = np.clip((zs + 3) / 6 * 100, 0, 100).tolist()
+    radar_data['signals'] = np.select([zs > 0.5, zs < -0.5], ['🟢', '🔴'], '⚪').tolist()
+    
     # 计算综合评分 (归一化到0-100)
-    avg_z = np.mean(radar_data['values'])
+    avg_z = zs.mean()
     radar_data['composite_score'] = min(100, max(0, (avg_z + 3) / 6 * 100))
     radar_data['composite_z'] = avg_z
     
@@ -488,6 +652,17 @@ def calculate_breadth_radar(indicators, yahoo_data=None):
 
 # ==================== 资金轮动趋势评分 ====================
 
+def _avg_z(factors):
+    """因子Z-Score均值，NaN按0计 (分母为全部因子数)"""
+    z = np.fromiter((f.get('z', 0) for f in factors), dtype=np.float64, count=len(factors))
+    return float(np.nansum(z)) / len(factors)
+
+
+def _z_to_score(z):
+    """Z-Score (约 -3 ~ +3) 线性映射到 -100 ~ +100 并截断"""
+    return min(100.0, max(-100.0, z / 3 * 100))
+
+
 def calculate_rotation_score(indicators, etf_scan_results=None):
     """
     计算资金轮动趋势综合评分 (-100 到 +100)
@@ -511,10 +686,8 @@ def calculate_rotation_score(indicators, etf_scan_results=None):
     # 1. 风险偏好因子
     risk_factors = us.get('risk_appetite', [])
     if risk_factors:
-        z_sum = sum(f.get('z', 0) for f in risk_factors if not pd.isna(f.get('z', 0)))
-        avg_z = z_sum / len(risk_factors) if risk_factors else 0
         # 转换为 -100 到 +100 (假设Z-Score范围是 -3 到 +3)
-        score_components['risk_appetite']['score'] = np.clip(avg_z / 3 * 100, -100, 100)
+        score_components['risk_appetite']['score'] = _z_to_score(_avg_z(risk_factors))
         score_components['risk_appetite']['factors'] = [
             {'name': f['name'], 'z': f.get('z', 0), 'signal': f.get('emoji', '⚪')}
             for f in risk_factors
@@ -523,9 +696,7 @@ def calculate_rotation_score(indicators, etf_scan_results=None):
     # 2. 板块轮动因子
     sector_factors = us.get('sector_rotation', [])
     if sector_factors:
-        z_sum = sum(f.get('z', 0) for f in sector_factors if not pd.isna(f.get('z', 0)))
-        avg_z = z_sum / len(sector_factors) if sector_factors else 0
-        score_components['sector_rotation']['score'] = np.clip(avg_z / 3 * 100, -100, 100)
+        score_components['sector_rotation']['score'] = _z_to_score(_avg_z(sector_factors))
         score_components['sector_rotation']['factors'] = [
             {'name': f['name'], 'z': f.get('z', 0), 'signal': f.get('emoji', '⚪')}
             for f in sector_factors
@@ -534,9 +705,7 @@ def calculate_rotation_score(indicators, etf_scan_results=None):
     # 3. 流动性广度因子
     breadth_factors = us.get('breadth', [])
     if breadth_factors:
-        z_sum = sum(f.get('z', 0) for f in breadth_factors if not pd.isna(f.get('z', 0)))
-        avg_z = z_sum / len(breadth_factors) if breadth_factors else 0
-        score_components['liquidity_breadth']['score'] = np.clip(avg_z / 3 * 100, -100, 100)
+        score_components['liquidity_breadth']['score'] = _z_to_score(_avg_z(breadth_factors))
         score_components['liquidity_breadth']['factors'] = [
             {'name': f['name'], 'z': f.get('z', 0), 'signal': f.get('emoji', '⚪')}
             for f in breadth_factors